@@ -1,11 +1,22 @@
-from flask import Flask, render_template, send_file, request, redirect, flash
+from flask import Flask, render_template, send_file, request, redirect, flash, jsonify
 import os
+import uuid
 import pandas as pd
-from db import get_engine
+from db import get_engine, check_health
 from uploader import ingest_file
-from statistics import fetch_data, compute_statistics, get_available_stations, validate_date_format
+from jobs import INGEST_MODE, enqueue_job, submit_job, get_job, recover_stale_jobs
+from statistics import fetch_statistics, get_available_stations, validate_date_format, build_filter_clause, \
+    DATE_COLUMN_MAPPING
+from maintenance import get_maintenance_status
+from daily_totals_store import use_long_storage, read_daily_totals_wide, read_daily_totals_page
+from schema_cache import get_tables, get_columns, get_column_types, get_date_columns, get_cache_stats
+from stats_cache import get_cache_stats as get_stats_cache_stats
+from pagination import get_row_count, fetch_keyset_page, row_cursor
+from frame_reader import read_typed_frame
+from table_schemas import TABLE_SCHEMAS
+from exporter import EXPORT_FORMATS, EXPORT_MIMETYPES, get_export_formats, export_query, export_frame
 from werkzeug.utils import secure_filename
-import io
+from urllib.parse import urlencode
 import logging
 from sqlalchemy import text
 from datetime import datetime
@@ -20,114 +31,84 @@ UPLOAD_FOLDER = 'uploads'
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 
-TABLE_NAMES = {
-    'hirst_ltklai_bi_hourly_data': 'LTKLAI HIRST Bi-hourly Data',
-    'hirst_ltsiau_bi_hourly_data': 'LTSIAU HIRST Bi-hourly Data',
-    'hirst_ltviln_bi_hourly_data': 'LTVILN HIRST Bi-hourly Data',
-    'hirst_daily_particle_totals': 'HIRST Daily Particle Totals',
-    'polen_sence_data': 'Pollen Sence Data'
-}
-
-DATE_COLUMN_MAPPING = {
-    'hirst_ltklai_bi_hourly_data': 'LTKLAI',
-    'hirst_ltsiau_bi_hourly_data': 'LTSIAU',
-    'hirst_ltviln_bi_hourly_data': 'LTVILN',
-    'hirst_daily_particle_totals': None,
-    'polen_sence_data': 'time'
-}
+try:
+    recover_stale_jobs()
+except Exception as e:
+    print(f"Could not check for interrupted ingest jobs: {e}")
 
+TABLE_NAMES = {table_name: schema['display_name'] for table_name, schema in TABLE_SCHEMAS.items()}
 
 def get_date_column_for_table(table_name):
     return DATE_COLUMN_MAPPING.get(table_name.lower())
 
 
-def filter_data_by_date(table_name, search_date, engine):
-    date_column = get_date_column_for_table(table_name)
-
+def get_date_filter(table_name, search_date, conn):
     if table_name.lower() == 'hirst_daily_particle_totals':
-        with engine.connect() as conn:
-            columns_query = text("""
-                SELECT column_name 
-                FROM information_schema.columns 
-                WHERE table_name = :table_name 
-                AND table_schema = 'public'
-                ORDER BY ordinal_position
-            """)
-            columns_result = conn.execute(columns_query, {"table_name": table_name}).fetchall()
-            all_columns = [row[0] for row in columns_result]
-
-            date_columns = []
-            for col in all_columns:
-                try:
-                    if len(col) >= 8 and ('-' in col or '/' in col):
-                        for date_format in ['%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y']:
-                            try:
-                                parsed_date = datetime.strptime(col, date_format)
-                                search_parsed = datetime.strptime(search_date, '%Y-%m-%d')
-                                if parsed_date.date() == search_parsed.date():
-                                    date_columns.append(col)
-                                break
-                            except ValueError:
-                                continue
-                except:
-                    continue
-
-            if date_columns:
-                essential_columns = []
-                for col in ['id', 'station', 'particle']:
-                    if col in all_columns:
-                        essential_columns.append(col)
-
-                select_columns = essential_columns + date_columns
-                columns_str = ', '.join([f'"{col}"' for col in select_columns])
-                query = text(f'SELECT {columns_str} FROM {table_name} ORDER BY station, particle')
-            else:
-                essential_columns = []
-                for col in ['id', 'station', 'particle']:
-                    if col in all_columns:
-                        essential_columns.append(col)
-
-                if essential_columns:
-                    columns_str = ', '.join([f'"{col}"' for col in essential_columns])
-                    query = text(f'SELECT {columns_str} FROM {table_name} WHERE 1=0')
-                else:
-                    query = text(f'SELECT * FROM {table_name} WHERE 1=0')
+        all_columns = get_columns(conn, table_name)
+        search_day = datetime.strptime(search_date, '%Y-%m-%d').date()
+        date_columns = [col for col, day in get_date_columns(conn, table_name).items() if day == search_day]
 
-            df = pd.read_sql(query, engine)
+        essential_columns = []
+        for col in ['id', 'station', 'particle']:
+            if col in all_columns:
+                essential_columns.append(col)
 
-    elif date_column:
-        if table_name.lower() == 'polen_sence_data':
-            query = text(f"""
-                SELECT * FROM {table_name} 
-                WHERE DATE("{date_column}") = :search_date
-                ORDER BY "{date_column}"
-            """)
-        else:
-            query = text(f"""
-                SELECT * FROM {table_name} 
-                WHERE "{date_column}" = :search_date
-                ORDER BY "{date_column}"
-            """)
+        if date_columns:
+            return essential_columns + date_columns, '', {}
+        return essential_columns or None, ' WHERE 1=0', {}
 
-        df = pd.read_sql(query, engine, params={"search_date": search_date})
-    else:
-        df = pd.read_sql(f'SELECT * FROM {table_name}', engine)
+    if get_date_column_for_table(table_name):
+        # Half-open day range instead of DATE("time") = :search_date, so the (time, id) index is usable.
+        where_sql, params = build_filter_clause(table_name.lower(), selected_date=search_date)
+        return None, where_sql, params
+
+    return None, '', {}
 
-    return df
+
+def filter_data_by_date(table_name, search_date, engine):
+    if table_name.lower() == 'hirst_daily_particle_totals' and use_long_storage():
+        search_day = datetime.strptime(search_date, '%Y-%m-%d').date()
+        with engine.connect() as conn:
+            return read_daily_totals_wide(conn, bounds=(search_day, search_day))
+
+    with engine.connect() as conn:
+        columns, where_sql, params = get_date_filter(table_name, search_date, conn)
+        columns_str = ', '.join([f'"{col}"' for col in columns]) if columns else '*'
+
+        date_column = get_date_column_for_table(table_name)
+        if table_name.lower() == 'hirst_daily_particle_totals':
+            order_sql = ' ORDER BY station, particle' if where_sql == '' else ''
+        elif date_column:
+            order_sql = f' ORDER BY "{date_column}"'
+        else:
+            order_sql = ''
+
+        query = text(f'SELECT {columns_str} FROM {table_name}{where_sql}{order_sql}')
+        return read_typed_frame(conn, query, table_name.lower(), params)
 
 
 @app.route('/')
 def index():
     engine = get_engine()
     with engine.connect() as conn:
-        tables = conn.execute(
-            text("SELECT table_name FROM information_schema.tables WHERE table_schema='public'")
-        ).fetchall()
-        table_names = [row[0] for row in tables]
+        table_names = get_tables(conn)
 
     return render_template('index.html', tables=table_names)
 
 
+@app.route('/health')
+def health():
+    status = check_health()
+    status['schema_cache'] = get_cache_stats()
+    status['stats_cache'] = get_stats_cache_stats()
+    return jsonify(status), 200 if status['status'] == 'ok' else 503
+
+
+@app.route('/maintenance/status')
+def maintenance_status():
+    return jsonify(get_maintenance_status())
+
+
 @app.route('/view/<table_name>')
 def view_table(table_name):
     try:
@@ -145,26 +126,31 @@ def view_table(table_name):
         if search_date:
             try:
                 datetime.strptime(search_date, '%Y-%m-%d')
-                df = filter_data_by_date(table_name, search_date, engine)
+            except ValueError:
+                flash('Invalid date format. Please use YYYY-MM-DD format.', 'danger')
+                search_date = ''
 
-                total_rows = len(df)
+        if search_date and table_name == 'hirst_daily_particle_totals' and use_long_storage():
+            df = filter_data_by_date(table_name, search_date, engine)
 
-                if sort_by in df.columns:
-                    ascending = (sort_dir == 'asc')
-                    df = df.sort_values(by=sort_by, ascending=ascending)
+            total_rows = len(df)
 
-                start_idx = (page - 1) * per_page
-                end_idx = start_idx + per_page
-                df = df.iloc[start_idx:end_idx]
+            if sort_by in df.columns:
+                ascending = (sort_dir == 'asc')
+                df = df.sort_values(by=sort_by, ascending=ascending)
 
-            except ValueError:
-                flash('Invalid date format. Please use YYYY-MM-DD format.', 'danger')
-                search_date = ''
-                df, total_rows = get_paginated_data(table_name, page, per_page, sort_by, sort_dir, engine)
+            start_idx = (page - 1) * per_page
+            end_idx = start_idx + per_page
+            df = df.iloc[start_idx:end_idx]
+            paging = offset_paging(page, per_page, total_rows)
         else:
-            df, total_rows = get_paginated_data(table_name, page, per_page, sort_by, sort_dir, engine)
+            df, total_rows, paging = get_paginated_data(table_name, page, per_page, sort_by, sort_dir, engine,
+                                                        get_page_cursor(request.args), search_date)
 
         total_pages = (total_rows + per_page - 1) // per_page
+        if request.args.get('last', type=int):
+            page = max(total_pages, 1)
+        page_urls = build_page_urls(page, total_pages, per_page, sort_by, sort_dir, search_date, paging)
 
         table_html = df.to_html(classes='table table-striped table-hover', index=False)
 
@@ -179,6 +165,8 @@ def view_table(table_name):
             total_pages=total_pages,
             per_page=per_page,
             total_rows=total_rows,
+            rows_estimated=paging['estimated'],
+            page_urls=page_urls,
             sort_by=sort_by,
             sort_dir=sort_dir,
             search_date=search_date
@@ -188,24 +176,28 @@ def view_table(table_name):
         return redirect('/')
 
 
-def get_paginated_data(table_name, page, per_page, sort_by, sort_dir, engine):
+def get_paginated_data(table_name, page, per_page, sort_by, sort_dir, engine, cursor=None, search_date=None):
     offset = (page - 1) * per_page
 
-    with engine.connect() as conn:
-        total_rows = conn.execute(
-            text(f"SELECT COUNT(*) FROM {table_name}")
-        ).scalar()
+    if table_name == 'hirst_daily_particle_totals' and use_long_storage():
+        with engine.connect() as conn:
+            df, total_rows = read_daily_totals_page(conn, per_page, offset, sort_by, sort_dir)
+        return df, total_rows, offset_paging(page, per_page, total_rows)
 
     with engine.connect() as conn:
-        columns_query = text("""
-            SELECT column_name 
-            FROM information_schema.columns 
-            WHERE table_name = :table_name 
-            AND table_schema = 'public'
-            ORDER BY ordinal_position
-        """)
-        columns_result = conn.execute(columns_query, {"table_name": table_name}).fetchall()
-        available_columns = [row[0] for row in columns_result]
+        column_types = get_column_types(conn, table_name)
+        available_columns = list(column_types)
+
+        select_columns, where_sql, params = None, '', {}
+        if search_date:
+            select_columns, where_sql, params = get_date_filter(table_name, search_date, conn)
+            if select_columns:
+                available_columns = select_columns
+            total_rows = conn.execute(text(f'SELECT COUNT(*) FROM {table_name}{where_sql}'), params).scalar()
+            estimated = False
+        else:
+            total_rows, estimated = get_row_count(conn, table_name)
+        select_sql = ', '.join([f'"{col}"' for col in select_columns]) if select_columns else '*'
 
         if sort_by not in available_columns:
             if 'id' in available_columns:
@@ -215,10 +207,74 @@ def get_paginated_data(table_name, page, per_page, sort_by, sort_dir, engine):
             else:
                 sort_by = '*'
 
-    query = text(f'SELECT * FROM {table_name} ORDER BY "{sort_by}" {sort_dir} LIMIT :limit OFFSET :offset')
-    df = pd.read_sql(query, engine, params={"limit": per_page, "offset": offset})
+        # Keyset paging needs the id tie-breaker; numbered page jumps still use OFFSET.
+        if 'id' in available_columns and (cursor is not None or page == 1):
+            df, has_prev, has_next = fetch_keyset_page(conn, table_name, column_types, sort_by, sort_dir,
+                                                       per_page, cursor, select_sql, where_sql, params)
+            paging = {'keyset': True, 'has_prev': has_prev, 'has_next': has_next, 'estimated': estimated}
+            if not df.empty:
+                paging['first'] = row_cursor(df, 0, sort_by)
+                paging['last'] = row_cursor(df, -1, sort_by)
+            else:
+                paging['keyset'] = False
+            return df, total_rows, paging
+
+        query = text(f'SELECT {select_sql} FROM {table_name}{where_sql} '
+                     f'ORDER BY "{sort_by}" {sort_dir} LIMIT :limit OFFSET :offset')
+        df = pd.read_sql(query, conn, params=dict(params, limit=per_page, offset=offset))
+
+    paging = offset_paging(page, per_page, total_rows)
+    paging['estimated'] = estimated
+    return df, total_rows, paging
+
+
+def offset_paging(page, per_page, total_rows):
+    return {'keyset': False, 'has_prev': page > 1, 'has_next': page * per_page < total_rows, 'estimated': False}
+
+
+def get_page_cursor(args):
+    if args.get('last', type=int):
+        return {'direction': 'last'}
 
-    return df, total_rows
+    for direction in ['after', 'before']:
+        cursor_id = args.get(f'{direction}_id', type=int)
+        if cursor_id is not None:
+            return {'direction': direction, 'value': args.get(direction), 'id': cursor_id}
+
+    return None
+
+
+def build_page_urls(page, total_pages, per_page, sort_by, sort_dir, search_date, paging):
+    base_args = {'per_page': per_page, 'sort_by': sort_by, 'sort_dir': sort_dir}
+    if search_date:
+        base_args['search_date'] = search_date
+
+    def page_url(page_number, **cursor_args):
+        return '?' + urlencode(dict(base_args, page=page_number, **cursor_args))
+
+    urls = {'first': page_url(1), 'prev': None, 'next': None, 'last': page_url(max(total_pages, 1))}
+
+    if paging['keyset']:
+        first, last = paging['first'], paging['last']
+        before_args = {'before_id': first['id']}
+        after_args = {'after_id': last['id']}
+        if first['value'] is not None:
+            before_args['before'] = first['value']
+        if last['value'] is not None:
+            after_args['after'] = last['value']
+
+        if paging['has_prev']:
+            urls['prev'] = page_url(max(page - 1, 1), **before_args)
+        if paging['has_next']:
+            urls['next'] = page_url(page + 1, **after_args)
+        urls['last'] = page_url(max(total_pages, 1), last=1)
+    else:
+        if paging['has_prev']:
+            urls['prev'] = page_url(page - 1)
+        if paging['has_next']:
+            urls['next'] = page_url(page + 1)
+
+    return urls
 
 
 @app.route('/stats/<table_name>', methods=['GET', 'POST'])
@@ -231,6 +287,12 @@ def view_stats(table_name):
         start_date = request.args.get('start_date', None)
         end_date = request.args.get('end_date', None)
         date_range_mode = request.args.get('date_range_mode', 'single')
+        export_format = request.args.get('format')
+
+        if export_format:
+            format_error = check_export_format(export_format)
+            if format_error:
+                return format_error
 
         display_stats = False
         sample_html = ""
@@ -252,7 +314,7 @@ def view_stats(table_name):
                 flash("Start date must be before end date.", 'danger')
                 return redirect(f'/stats/{table_name}')
 
-            df, stats_df = fetch_data(
+            df, stats_df = fetch_statistics(
                 table_name,
                 selected_date=None,
                 selected_station=selected_station,
@@ -262,6 +324,11 @@ def view_stats(table_name):
 
             date_range_display = f"{formatted_start_date} to {formatted_end_date}"
 
+            if export_format:
+                output, _ = export_frame(stats_export_frame(stats_df), export_format, 'statistics')
+                filename = f"{table_name}_statistics_{formatted_start_date}_{formatted_end_date}"
+                return send_export(output, export_format, filename)
+
             if not df.empty:
                 if isinstance(stats_df, dict) and 'regular' in stats_df and 'total' in stats_df:
                     display_stats = True
@@ -312,7 +379,7 @@ def view_stats(table_name):
                                 rows[i] = styled_row
                         stats_html = '</tr>'.join(rows)
                 else:
-                    stats = compute_statistics(stats_df)
+                    stats = stats_df
                     display_stats = True
                     stats_html = stats.round(2).to_html(classes='table table-striped table-hover')
 
@@ -327,7 +394,7 @@ def view_stats(table_name):
                 flash(f"Invalid date format. Please use YYYY-MM-DD format.", 'danger')
                 return redirect(f'/stats/{table_name}')
 
-            df, stats_df = fetch_data(
+            df, stats_df = fetch_statistics(
                 table_name,
                 selected_date=formatted_date,
                 selected_station=selected_station
@@ -335,6 +402,10 @@ def view_stats(table_name):
 
             date_range_display = formatted_date
 
+            if export_format:
+                output, _ = export_frame(stats_export_frame(stats_df), export_format, 'statistics')
+                return send_export(output, export_format, f"{table_name}_statistics_{formatted_date}")
+
             if not df.empty:
                 if isinstance(stats_df, dict) and 'regular' in stats_df and 'total' in stats_df:
                     display_stats = True
@@ -375,7 +446,7 @@ def view_stats(table_name):
                             else:
                                 total_stats_html = '</tr>'.join(rows)
                 else:
-                    stats = compute_statistics(stats_df)
+                    stats = stats_df
                     display_stats = True
 
                     stats_html = stats.round(2).to_html(classes='table table-striped table-hover')
@@ -409,6 +480,39 @@ def view_stats(table_name):
         return redirect('/')
 
 
+def check_export_format(export_format):
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': f"Unknown format '{export_format}'. Use one of: {', '.join(EXPORT_FORMATS)}"}), 400
+    if export_format not in get_export_formats():
+        return jsonify({'error': f"The {export_format} format requires pyarrow to be installed"}), 400
+    return None
+
+
+def send_export(output, export_format, filename):
+    return send_file(
+        output,
+        download_name=f"{filename}.{export_format}",
+        as_attachment=True,
+        mimetype=EXPORT_MIMETYPES[export_format]
+    )
+
+
+def stats_export_frame(stats_df):
+    if isinstance(stats_df, dict):
+        frames = []
+        for group, group_df in stats_df.items():
+            frame = stats_export_frame(group_df)
+            frame.insert(0, 'group', group)
+            frames.append(frame)
+        return pd.concat(frames, ignore_index=True)
+
+    if isinstance(stats_df.index, pd.RangeIndex):
+        return stats_df.copy()
+
+    frame = stats_df.reset_index()
+    return frame.rename(columns={'index': 'column'})
+
+
 @app.route('/download/<table_name>')
 def download_table(table_name):
     engine = get_engine()
@@ -416,28 +520,35 @@ def download_table(table_name):
     search_date = request.args.get('search_date', '')
     sort_by = request.args.get('sort_by', 'id')
     sort_dir = request.args.get('sort_dir', 'asc')
+    export_format = request.args.get('format', 'xlsx')
 
     if sort_dir not in ['asc', 'desc']:
         sort_dir = 'asc'
 
+    format_error = check_export_format(export_format)
+    if format_error:
+        return format_error
+
+    long_storage = table_name == 'hirst_daily_particle_totals' and use_long_storage()
+
     with engine.connect() as conn:
-        columns_query = text("""
-            SELECT column_name 
-            FROM information_schema.columns 
-            WHERE table_name = :table_name 
-            AND table_schema = 'public'
-            ORDER BY ordinal_position
-        """)
-        columns_result = conn.execute(columns_query, {"table_name": table_name}).fetchall()
-        available_columns = [row[0] for row in columns_result]
+        available_columns = get_columns(conn, table_name)
 
-        if sort_by not in available_columns:
+        if long_storage and sort_by not in ['station', 'particle']:
+            sort_by = 'station'
+        elif sort_by not in available_columns:
             if 'id' in available_columns:
                 sort_by = 'id'
             elif available_columns:
                 sort_by = available_columns[0]
 
-    if search_date:
+    df = None
+    if long_storage and not search_date:
+        with engine.connect() as conn:
+            df = read_daily_totals_wide(conn)
+        if not df.empty:
+            df = df.sort_values(by=sort_by, ascending=(sort_dir == 'asc'))
+    elif search_date:
         try:
             datetime.strptime(search_date, '%Y-%m-%d')
             df = filter_data_by_date(table_name, search_date, engine)
@@ -447,44 +558,28 @@ def download_table(table_name):
                 df = df.sort_values(by=sort_by, ascending=ascending)
 
         except ValueError:
-            query = text(f'SELECT * FROM {table_name} ORDER BY "{sort_by}" {sort_dir}')
-            df = pd.read_sql(query, engine)
-    else:
-        query = text(f'SELECT * FROM {table_name} ORDER BY "{sort_by}" {sort_dir}')
-        df = pd.read_sql(query, engine)
-
-    if 'id' in df.columns:
-        df = df.drop('id', axis=1)
-
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        df.to_excel(writer, sheet_name=table_name, index=False)
-
-        workbook = writer.book
-        worksheet = writer.sheets[table_name]
-
-        for i, col in enumerate(df.columns):
-            max_len = max(
-                df[col].astype(str).apply(len).max(),
-                len(str(col))
-            )
-            worksheet.set_column(i, i, min(max(max_len + 2, 10), 50))
+            df = None
 
-    output.seek(0)
+    with engine.connect() as conn:
+        if df is None:
+            # Full-table exports are streamed from a server-side cursor (or COPY) instead of read_sql.
+            export_columns = [col for col in available_columns if col != 'id']
+            columns_str = ', '.join([f'"{col}"' for col in export_columns]) or '*'
+            query = f'SELECT {columns_str} FROM {table_name} ORDER BY "{sort_by}" {sort_dir}'
+            output, row_count = export_query(conn, query, export_format, table_name)
+        else:
+            if 'id' in df.columns:
+                df = df.drop('id', axis=1)
+            output, row_count = export_frame(df, export_format, table_name)
 
     friendly_name = TABLE_NAMES.get(table_name, table_name).replace(' ', '_')
 
     if search_date:
-        filename = f"{friendly_name}_{search_date}.xlsx"
+        filename = f"{friendly_name}_{search_date}"
     else:
-        filename = f"{friendly_name}.xlsx"
+        filename = friendly_name
 
-    return send_file(
-        output,
-        download_name=filename,
-        as_attachment=True,
-        mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    )
+    return send_export(output, export_format, filename)
 
 
 @app.route('/upload', methods=['POST'])
@@ -501,13 +596,20 @@ def upload_file():
         return redirect('/')
 
     filename = secure_filename(file.filename)
-    filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+    # Queued jobs read their file later, so every upload gets its own path even when names repeat.
+    filepath = os.path.join(app.config['UPLOAD_FOLDER'], f'{uuid.uuid4().hex}_{filename}')
 
     try:
         file.save(filepath)
 
-        ingest_file(filepath, table)
-        flash(f'Successfully uploaded and processed: {filename}', 'success')
+        if INGEST_MODE == 'async':
+            job_id = enqueue_job(filepath, filename, table)
+            submit_job(job_id)
+            flash(f'Uploaded {filename}; processing in the background as job {job_id} '
+                  f'(status: /jobs/{job_id})', 'success')
+        else:
+            ingest_file(filepath, table)
+            flash(f'Successfully uploaded and processed: {filename}', 'success')
 
     except Exception as e:
         if os.path.exists(filepath):
@@ -520,5 +622,13 @@ def upload_file():
 
     return redirect('/')
 
+
+@app.route('/jobs/<int:job_id>')
+def job_status(job_id):
+    job = get_job(job_id)
+    if job is None:
+        return jsonify({'error': f'Job {job_id} not found'}), 404
+    return jsonify(job)
+
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
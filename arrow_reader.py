@@ -0,0 +1,102 @@
+import os
+import tempfile
+from sqlalchemy import text
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = None
+    pa_csv = None
+
+READ_BACKEND = os.environ.get('READ_BACKEND', 'auto')
+ARROW_BLOCK_BYTES = int(os.environ.get('ARROW_BLOCK_BYTES', 4 * 1024 * 1024))
+ARROW_SPOOL_BYTES = int(os.environ.get('ARROW_SPOOL_BYTES', 64 * 1024 * 1024))
+
+# PostgreSQL type OIDs from cursor.description; anything else is read as text.
+ARROW_TYPES = {
+    16: 'bool',
+    20: 'int64',
+    21: 'int16',
+    23: 'int32',
+    700: 'float32',
+    701: 'float64',
+    1700: 'float64',
+    1082: 'date32',
+    1114: 'timestamp',
+    1184: 'timestamptz',
+    25: 'string',
+    1043: 'string',
+}
+
+
+def arrow_reads_enabled():
+    return pa is not None and READ_BACKEND != 'pandas'
+
+
+def arrow_type(type_code):
+    name = ARROW_TYPES.get(type_code, 'string')
+    if name == 'timestamp':
+        return pa.timestamp('us')
+    if name == 'timestamptz':
+        return pa.timestamp('us', tz='UTC')
+    return pa.type_for_alias(name)
+
+
+def render_query(conn, cursor, query, params=None):
+    # COPY cannot take bind parameters, so they are inlined with psycopg2's own quoting.
+    compiled = (text(query) if isinstance(query, str) else query).compile(dialect=conn.dialect)
+    return cursor.mogrify(str(compiled), compiled.construct_params(params or {})).decode()
+
+
+def describe_query(cursor, sql):
+    cursor.execute(f'SELECT * FROM ({sql}) AS source LIMIT 0')
+    return pa.schema([(column[0], arrow_type(column[1])) for column in cursor.description])
+
+
+def copy_query(conn, query, params=None):
+    cursor = conn.connection.cursor()
+    try:
+        sql = render_query(conn, cursor, query, params)
+        schema = describe_query(cursor, sql)
+        output = tempfile.SpooledTemporaryFile(max_size=ARROW_SPOOL_BYTES)
+        cursor.copy_expert(f'COPY ({sql}) TO STDOUT WITH (FORMAT csv, HEADER)', output)
+    finally:
+        cursor.close()
+
+    output.seek(0)
+    return schema, output
+
+
+def csv_options(schema):
+    # PostgreSQL writes NULL as an empty unquoted field and an empty string as "".
+    return {
+        'read_options': pa_csv.ReadOptions(block_size=ARROW_BLOCK_BYTES),
+        'convert_options': pa_csv.ConvertOptions(
+            column_types=schema, null_values=[''], strings_can_be_null=True, quoted_strings_can_be_null=False,
+            true_values=['t'], false_values=['f'],
+        ),
+    }
+
+
+def read_arrow_table(conn, query, params=None):
+    schema, output = copy_query(conn, query, params)
+    try:
+        table = pa_csv.read_csv(output, **csv_options(schema))
+    finally:
+        output.close()
+    return table
+
+
+def iter_arrow_batches(conn, query, params=None):
+    schema, output = copy_query(conn, query, params)
+    reader = pa_csv.open_csv(output, **csv_options(schema))
+
+    def batches():
+        try:
+            for batch in reader:
+                yield batch
+        finally:
+            output.close()
+
+    return schema, batches()
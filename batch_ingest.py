@@ -0,0 +1,140 @@
+import os
+import sys
+import glob
+import time
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+from uploader import KEY_COLUMNS, iter_sheet_frames, detect_table, validate_columns, normalize_columns, \
+    store_chunks_to_db
+
+BATCH_INGEST_WORKERS = int(os.environ.get('BATCH_INGEST_WORKERS', os.cpu_count() or 1))
+
+SUPPORTED_EXTENSIONS = ('.csv', '.xls', '.xlsx', '.json')
+
+
+def expand_inputs(inputs):
+    files = []
+    for pattern in inputs:
+        if os.path.isdir(pattern):
+            for root, _, names in os.walk(pattern):
+                files.extend(os.path.join(root, name) for name in names
+                             if name.lower().endswith(SUPPORTED_EXTENSIONS))
+        else:
+            files.extend(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+
+    # A file matched by several patterns is only ingested once.
+    return sorted(set(os.path.abspath(path) for path in files))
+
+
+def parse_file(file_path, table_name=None):
+    start = time.perf_counter()
+    frames, failures = [], []
+
+    try:
+        for sheet_name, df in iter_sheet_frames(file_path):
+            source = f'{file_path} [{sheet_name}]' if sheet_name is not None else file_path
+            try:
+                target = table_name or detect_table(df)
+                validate_columns(df, target)
+                frames.append({'source': source, 'table_name': target, 'df': normalize_columns(df, target)})
+            except Exception as e:
+                failures.append({'source': source, 'error': str(e)})
+    except Exception as e:
+        failures.append({'source': file_path, 'error': str(e)})
+
+    return {
+        'file': file_path,
+        'frames': frames,
+        'failures': failures,
+        'rows': sum(len(frame['df']) for frame in frames),
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def combine_frames(frames, table_name):
+    df = pd.concat(frames, ignore_index=True, sort=False)
+    key_columns = [col for col in KEY_COLUMNS.get(table_name, []) if col in df.columns]
+    if len(frames) == 1 or not key_columns:
+        return df
+
+    # Files can cover different columns for the same key (e.g. daily totals for different dates),
+    # so keep the last non-empty value of each column rather than the last row.
+    return df.groupby(key_columns, sort=False, dropna=False).last().reset_index()
+
+
+def batch_ingest(inputs, table_name=None, workers=None):
+    files = expand_inputs(inputs)
+    workers = max(1, min(workers or BATCH_INGEST_WORKERS, len(files) or 1))
+    report = {'files': [], 'failures': [], 'tables': {}}
+    frames_by_table = {}
+
+    print(f"Parsing {len(files)} file(s) with {workers} worker(s)")
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+        futures = {executor.submit(parse_file, path, table_name): path for path in files}
+        for future in as_completed(futures):
+            try:
+                parsed = future.result()
+            except Exception as e:
+                report['failures'].append({'source': futures[future], 'error': str(e)})
+                print(f"  FAILED {futures[future]}: {e}")
+                continue
+
+            rate = parsed['rows'] / parsed['seconds'] if parsed['seconds'] > 0 else float('inf')
+            report['files'].append({'file': parsed['file'], 'rows': parsed['rows'],
+                                    'seconds': round(parsed['seconds'], 3), 'rows_per_sec': round(rate)})
+            print(f"  {parsed['file']}: {parsed['rows']} rows in {parsed['seconds']:.2f}s ({rate:.0f} rows/sec)")
+
+            for failure in parsed['failures']:
+                report['failures'].append(failure)
+                print(f"  FAILED {failure['source']}: {failure['error']}")
+            for frame in parsed['frames']:
+                frames_by_table.setdefault(frame['table_name'], []).append(frame['df'])
+
+    report['parse_seconds'] = round(time.perf_counter() - start, 3)
+
+    for target, frames in frames_by_table.items():
+        merge_start = time.perf_counter()
+        try:
+            # One staging table and one upsert per target table, however many files fed it.
+            result = store_chunks_to_db([combine_frames(frames, target)], target)
+            result['sources'] = len(frames)
+            result['seconds'] = round(time.perf_counter() - merge_start, 3)
+            report['tables'][target] = result
+        except Exception as e:
+            report['failures'].append({'source': target, 'error': str(e)})
+            print(f"  FAILED merge into {target}: {e}")
+
+    report['seconds'] = round(time.perf_counter() - start, 3)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Ingest many files (every sheet of each workbook) in one batch')
+    parser.add_argument('inputs', nargs='+', help='files, directories or glob patterns')
+    parser.add_argument('--table', default=None, help='target table (detected per sheet by default)')
+    parser.add_argument('--workers', type=int, default=BATCH_INGEST_WORKERS)
+    args = parser.parse_args(argv)
+
+    report = batch_ingest(args.inputs, args.table, args.workers)
+
+    total_rows = sum(item['rows'] for item in report['files'])
+    print()
+    print(f"Parsed {len(report['files'])} file(s), {total_rows} rows in {report['parse_seconds']:.2f}s")
+    for target, result in report['tables'].items():
+        print(f"  {target}: {result['sources']} source(s), {result['rows_in_file']} rows, "
+              f"merged in {result['seconds']:.2f}s")
+    if report['failures']:
+        print(f"{len(report['failures'])} failure(s):")
+        for failure in report['failures']:
+            print(f"  {failure['source']}: {failure['error']}")
+        return 1
+    print(f"Done in {report['seconds']:.2f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,74 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import get_engine
+from bulk_loader import load_staging_table
+
+TARGET_TABLE = 'bench_polen_sence_data'
+
+
+def make_sensor_frame(rows):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'time': pd.date_range('2020-01-01', periods=rows, freq='min'),
+        'pollen': rng.random(rows) * 500,
+        'mold': rng.random(rows) * 50,
+        'plastic_particles': rng.random(rows) * 5,
+    })
+
+
+def run(engine, df, method):
+    staging_name = f'bench_staging_{method}'
+    with engine.connect() as connection:
+        start = time.perf_counter()
+        load_staging_table(connection, engine, df, TARGET_TABLE, staging_name, method=method)
+        seconds = time.perf_counter() - start
+        connection.execute(text(f'DROP TABLE IF EXISTS "{staging_name}"'))
+        connection.commit()
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare COPY and to_sql staging loads')
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--max-to-sql-rows', type=int, default=100_000)
+    args = parser.parse_args()
+
+    engine = get_engine()
+    with engine.begin() as connection:
+        connection.execute(text(f'DROP TABLE IF EXISTS {TARGET_TABLE}'))
+        connection.execute(text(
+            f'CREATE TABLE {TARGET_TABLE} (id serial, time timestamp, pollen real, mold real, plastic_particles real)'
+        ))
+
+    results = []
+    for rows in args.rows:
+        df = make_sensor_frame(rows)
+        copy_seconds = run(engine, df, 'copy')
+        to_sql_seconds = run(engine, df, 'to_sql') if rows <= args.max_to_sql_rows else None
+        results.append((rows, copy_seconds, to_sql_seconds))
+
+    with engine.begin() as connection:
+        connection.execute(text(f'DROP TABLE IF EXISTS {TARGET_TABLE}'))
+
+    print()
+    print(f"{'rows':>9} {'copy s':>8} {'copy rows/s':>12} {'to_sql s':>9} {'to_sql rows/s':>14} {'speedup':>8}")
+    for rows, copy_seconds, to_sql_seconds in results:
+        if to_sql_seconds is None:
+            to_sql_text, to_sql_rate, speedup = 'skipped', '-', '-'
+        else:
+            to_sql_text = f'{to_sql_seconds:.2f}'
+            to_sql_rate = f'{rows / to_sql_seconds:.0f}'
+            speedup = f'{to_sql_seconds / copy_seconds:.1f}x'
+        print(f"{rows:>9} {copy_seconds:>8.2f} {rows / copy_seconds:>12.0f} {to_sql_text:>9} {to_sql_rate:>14} {speedup:>8}")
+
+
+if __name__ == '__main__':
+    main()
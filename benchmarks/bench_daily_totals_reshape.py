@@ -0,0 +1,63 @@
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from statistics import melt_date_columns
+
+
+def make_daily_totals(stations, particles, days):
+    rng = np.random.default_rng(0)
+    dates = [d.strftime('%Y-%m-%d') for d in pd.date_range('2024-03-01', periods=days)]
+    index = pd.MultiIndex.from_product([[f'ST{i}' for i in range(stations)],
+                                        [f'P{i}' for i in range(particles - 1)] + ['TOTAL']],
+                                       names=['station', 'particle'])
+    values = pd.DataFrame(rng.integers(0, 200, size=(len(index), days)).astype(float), index=index, columns=dates)
+    df = values.reset_index()
+    df.insert(0, 'id', range(1, len(df) + 1))
+    return df, dates
+
+
+def iterrows_reshape(df, date_columns):
+    non_date_columns = [col for col in df.columns if col not in date_columns]
+    stats_by_date = pd.DataFrame()
+    for index, row in df.iterrows():
+        row_data = {col: row[col] for col in non_date_columns}
+        for date_col in date_columns:
+            new_row = row_data.copy()
+            new_row['date'] = date_col
+            new_row['value'] = row[date_col]
+            stats_by_date = pd.concat([stats_by_date, pd.DataFrame([new_row])], ignore_index=True)
+    return stats_by_date
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    print(f"{'stations':>8} {'particles':>9} {'days':>5} {'cells':>8} {'iterrows s':>11} {'melt s':>9} {'speedup':>8}")
+    for stations, particles, days in [(1, 10, 7), (3, 10, 30), (3, 30, 60), (3, 40, 120), (3, 40, 365)]:
+        df, dates = make_daily_totals(stations, particles, days)
+        cells = len(df) * len(dates)
+
+        melted, melt_seconds = timed(melt_date_columns, df, dates)
+
+        if cells <= 20000:
+            looped, loop_seconds = timed(iterrows_reshape, df, dates)
+            assert np.isclose(looped['value'].sum(), melted['value'].sum())
+            speedup = f'{loop_seconds / melt_seconds:.0f}x'
+            loop_text = f'{loop_seconds:.3f}'
+        else:
+            loop_text, speedup = 'skipped', '-'
+
+        print(f"{stations:>8} {particles:>9} {days:>5} {cells:>8} {loop_text:>11} {melt_seconds:>9.4f} {speedup:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+import io
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+import pandas as pd
+from sqlalchemy import text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import get_engine
+from exporter import get_export_formats, export_query
+
+TABLE = 'bench_export_polen_sence_data'
+
+
+def fill_table(engine, rows):
+    with engine.begin() as connection:
+        connection.execute(text(f'DROP TABLE IF EXISTS {TABLE}'))
+        connection.execute(text(
+            f'CREATE TABLE {TABLE} (id serial, time timestamp, pollen real, mold real, plastic_particles real)'
+        ))
+        connection.execute(text(f"""
+            INSERT INTO {TABLE} (time, pollen, mold, plastic_particles)
+            SELECT timestamp '2020-01-01' + g * interval '1 minute', random() * 500, random() * 50, random() * 5
+            FROM generate_series(1, :rows) AS g
+        """), {"rows": rows})
+
+
+def export_read_sql(engine):
+    df = pd.read_sql(text(f'SELECT * FROM {TABLE} ORDER BY id'), engine).drop('id', axis=1)
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
+        df.to_excel(writer, sheet_name=TABLE[:31], index=False)
+        worksheet = writer.sheets[TABLE[:31]]
+        for i, col in enumerate(df.columns):
+            max_len = max(df[col].astype(str).apply(len).max(), len(str(col)))
+            worksheet.set_column(i, i, min(max(max_len + 2, 10), 50))
+    return output.getbuffer().nbytes
+
+
+def make_export(export_format):
+    def export(engine):
+        with engine.connect() as conn:
+            output, _ = export_query(
+                conn, f'SELECT time, pollen, mold, plastic_particles FROM {TABLE} ORDER BY id', export_format, TABLE
+            )
+        output.seek(0, os.SEEK_END)
+        size = output.tell()
+        output.close()
+        return size
+    return export
+
+
+def measure(func, engine, trace_memory):
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    size = func(engine)
+    seconds = time.perf_counter() - start
+    peak = None
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peak = peak / 1024 / 1024
+    return seconds, peak, size / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare export time, size and memory per download format')
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 500_000])
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='record peak Python memory with tracemalloc (slows every export down)')
+    args = parser.parse_args()
+
+    exports = [('xlsx read_sql', export_read_sql)]
+    exports += [(export_name, make_export(export_name)) for export_name in get_export_formats()]
+
+    engine = get_engine()
+    results = []
+    for rows in args.rows:
+        fill_table(engine, rows)
+        for name, func in exports:
+            results.append((rows, name) + measure(func, engine, args.trace_memory))
+
+    with engine.begin() as connection:
+        connection.execute(text(f'DROP TABLE IF EXISTS {TABLE}'))
+
+    print()
+    print(f"{'rows':>9} {'format':<14} {'seconds':>8} {'rows/s':>10} {'size MB':>8} {'peak MB':>8}")
+    for rows, name, seconds, peak, size in results:
+        peak_text = f'{peak:.1f}' if peak is not None else '-'
+        print(f"{rows:>9} {name:<14} {seconds:>8.2f} {rows / seconds:>10.0f} {size:>8.2f} {peak_text:>8}")
+
+
+if __name__ == '__main__':
+    main()
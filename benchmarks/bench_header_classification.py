@@ -0,0 +1,65 @@
+import os
+import sys
+import time
+import argparse
+import warnings
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import header_classifier
+from header_classifier import is_date_header, classify_headers
+
+
+def make_headers(date_columns, style):
+    days = pd.date_range('2024-01-01', periods=date_columns)
+    if style == 'iso':
+        dates = [day.strftime('%Y-%m-%d') for day in days]
+    else:
+        dates = [day.strftime('%d/%m/%Y') for day in days]
+    return ['station', 'particle', 'Pollen Factor', 'Spores Factor', 'notes'] + dates
+
+
+def pandas_passes(headers):
+    # The previous ingest path: detection, column creation and column filtering each probed every header.
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        for _ in range(3):
+            [col for col in headers if isinstance(col, str) and pd.to_datetime(col, errors='coerce') is not pd.NaT]
+
+
+def classifier_passes(headers):
+    classify_headers(headers)
+    for _ in range(2):
+        [col for col in headers if isinstance(col, str) and is_date_header(col)]
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Header classification cost on wide daily-totals sheets')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'date cols':>9} {'style':>9} {'to_datetime ms':>15} {'cold ms':>9} {'warm ms':>9} {'speedup':>8}")
+    for date_columns in [50, 400, 2000]:
+        for style in ['iso', 'slashed']:
+            headers = make_headers(date_columns, style)
+
+            old = min(timed(pandas_passes, headers) for _ in range(args.repeat))
+            cold = []
+            for _ in range(args.repeat):
+                header_classifier._header_dates.clear()
+                cold.append(timed(classifier_passes, headers))
+            warm = min(timed(classifier_passes, headers) for _ in range(args.repeat))
+
+            print(f"{date_columns:>9} {style:>9} {old * 1000:>15.1f} {min(cold) * 1000:>9.2f} "
+                  f"{warm * 1000:>9.2f} {old / min(cold):>7.0f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from table_schemas import BI_HOURLY_NUMERIC_COLUMNS, compile_coercion, apply_coercion
+
+TABLE = 'hirst_ltklai_bi_hourly_data'
+DB_COL_INFO = dict([('LTKLAI', 'date'), ('Particle', 'text')] +
+                   [(col, 'real') for col in BI_HOURLY_NUMERIC_COLUMNS])
+
+
+def make_frame(rows, as_text):
+    rng = np.random.default_rng(0)
+    days = pd.date_range('2000-01-01', periods=rows // 40 + 1).strftime('%Y-%m-%d')
+    df = pd.DataFrame({
+        'LTKLAI': np.repeat(days, 40)[:rows],
+        'Particle': np.tile([f'P{i}' for i in range(40)], rows // 40 + 1)[:rows],
+    })
+    for col in BI_HOURLY_NUMERIC_COLUMNS:
+        values = rng.integers(0, 500, rows).astype(float)
+        df[col] = values.astype(str) if as_text else values
+    return df
+
+
+def legacy_coerce(df, db_col_info):
+    # The per-table if-chain store_to_db used before the schema registry.
+    if 'LTKLAI' in df.columns and not pd.api.types.is_datetime64_any_dtype(df['LTKLAI']):
+        df['LTKLAI'] = pd.to_datetime(df['LTKLAI'])
+    for col in BI_HOURLY_NUMERIC_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+
+    valid_cols = [col for col in df.columns if col in db_col_info]
+    df = df[valid_cols]
+    for col in valid_cols:
+        data_type = db_col_info[col]
+        if data_type in ('real', 'double precision', 'numeric'):
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+        elif data_type == 'date' and col in ['LTKLAI', 'LTSIAU', 'LTVILN']:
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+    [f"  - {col}: {df[col].dtype}" for col in df.columns]
+    return df, valid_cols
+
+
+def cpu_time(func, df, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        frame = df.copy()
+        start = time.process_time()
+        func(frame)
+        best = min(best, time.process_time() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='CPU time of ingest coercion: if-chains vs the schema registry')
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    plan = compile_coercion(TABLE, DB_COL_INFO)
+    print(f"{'rows':>9} {'input':>7} {'legacy us/row':>14} {'registry us/row':>16} {'speedup':>8}")
+    for rows in args.rows:
+        for as_text in [False, True]:
+            df = make_frame(rows, as_text)
+            legacy = cpu_time(lambda frame: legacy_coerce(frame, DB_COL_INFO), df, args.repeat)
+            registry = cpu_time(lambda frame: apply_coercion(frame, plan), df, args.repeat)
+            print(f"{rows:>9} {'text' if as_text else 'numeric':>7} {legacy / rows * 1e6:>14.3f} "
+                  f"{registry / rows * 1e6:>16.3f} {legacy / registry:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import parallel_stats
+from parallel_stats import parallel_frame_statistics, parallel_date_statistics
+
+
+def daily_totals_frame(stations, particles, days):
+    # The wide daily totals table: one row per station and particle, one real column per date.
+    rng = np.random.default_rng(0)
+    dates = pd.date_range('2000-01-01', periods=days).strftime('%Y-%m-%d')
+    values = rng.integers(0, 500, (stations * particles, days)).astype('float32')
+    return pd.DataFrame(values, columns=dates)
+
+
+def bi_hourly_frame(rows):
+    rng = np.random.default_rng(1)
+    columns = [f'{hour:02d}-{hour + 2:02d}' for hour in range(0, 24, 2)] + ['Daily Total']
+    return pd.DataFrame(rng.integers(0, 500, (rows, len(columns))).astype('float32'), columns=columns)
+
+
+def melted_values(days, values_per_day):
+    rng = np.random.default_rng(2)
+    dates = pd.date_range('2000-01-01', periods=days).strftime('%Y-%m-%d')
+    return pd.DataFrame({'date': np.repeat(dates, values_per_day), 'value': rng.random(days * values_per_day)})
+
+
+def best_time(func, data, workers, repeat):
+    func(data, workers)
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(data, workers)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Scaling of the parallel statistics executor over worker counts')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    parallel_stats.PARALLEL_STATS_MIN_VALUES = 0
+    workloads = [
+        ('daily totals by date column', parallel_frame_statistics, daily_totals_frame(3, 300, 3650)),
+        ('bi-hourly columns', parallel_frame_statistics, bi_hourly_frame(2000000)),
+        ('per-date pivot', parallel_date_statistics, melted_values(3650, 600)),
+    ]
+
+    print(f"CPUs available: {os.cpu_count()}")
+    print(f"{'workload':>28} {'workers':>8} {'seconds':>8} {'speedup':>8} {'max abs diff':>13}")
+    for name, func, data in workloads:
+        baseline = None
+        for workers in args.workers:
+            seconds, result = best_time(func, data, workers, args.repeat)
+            if baseline is None:
+                baseline = (seconds, result)
+            difference = np.nanmax(np.abs(result.select_dtypes('number').to_numpy(dtype='float64') -
+                                          baseline[1].select_dtypes('number').to_numpy(dtype='float64')))
+            print(f"{name:>28} {workers:>8} {seconds:>8.2f} {baseline[0] / seconds:>7.1f}x {difference:>13.1e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quantile_sketch import SKETCH_PERCENTILES, build_sketch, merge_sketches, sketch_quantiles
+
+LEVELS = [0.5] + SKETCH_PERCENTILES
+
+
+def make_days(distribution, stations, days, rows_per_day):
+    rng = np.random.default_rng(0)
+    size = (stations, days, rows_per_day)
+    if distribution == 'uniform':
+        values = rng.random(size) * 500
+    elif distribution == 'lognormal':
+        values = rng.lognormal(3, 1.2, size)
+    else:
+        # Pollen-like counts: mostly zeros with seasonal bursts.
+        values = np.where(rng.random(size) < 0.6, 0, rng.poisson(20, size)).astype(float)
+    return [day for station in values for day in station]
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def exact_quantiles(day_values):
+    return np.quantile(np.concatenate(day_values), LEVELS)
+
+
+def sketch_range(sketches):
+    return sketch_quantiles(*merge_sketches(sketches), LEVELS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Accuracy and speed of merged quantile sketches vs exact quantiles')
+    parser.add_argument('--stations', type=int, default=3)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--rows-per-day', type=int, default=1440)
+    args = parser.parse_args()
+
+    names = ['Median'] + [f'P{round(level * 100)}' for level in SKETCH_PERCENTILES]
+    print(f"{args.stations} station(s) x {args.days} days x {args.rows_per_day} rows/day")
+    print(f"{'distribution':<12} {'exact ms':>9} {'build ms':>9} {'merge ms':>9}  "
+          + ' '.join(f'{name + " err":>11}' for name in names))
+
+    for distribution in ['uniform', 'lognormal', 'counts']:
+        day_values = make_days(distribution, args.stations, args.days, args.rows_per_day)
+
+        exact, exact_seconds = timed(exact_quantiles, day_values)
+        sketches, build_seconds = timed(lambda: [build_sketch(values) for values in day_values])
+        approx, merge_seconds = timed(sketch_range, sketches)
+
+        spread = exact[-1] - exact[0] or 1.0
+        errors = [abs(a - e) / spread for a, e in zip(approx, exact)]
+        print(f"{distribution:<12} {exact_seconds * 1000:>9.1f} {build_seconds * 1000:>9.1f} "
+              f"{merge_seconds * 1000:>9.1f}  " + ' '.join(f'{error:>11.2e}' for error in errors))
+
+    print()
+    print("exact: one sort over every value in the range (what median/percentile_cont do).")
+    print("build: one-off cost per day, paid at upload time by the rollups.")
+    print("merge: combining the stored day sketches for the whole range at query time.")
+    print("err:   |sketch - exact| / (P99 - median) of the merged range.")
+
+
+if __name__ == '__main__':
+    main()
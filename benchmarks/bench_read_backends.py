@@ -0,0 +1,91 @@
+import os
+import sys
+import time
+import argparse
+import pandas as pd
+from sqlalchemy import text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import get_engine
+from arrow_reader import iter_arrow_batches
+from exporter import iter_record_batches, write_parquet
+import arrow_reader
+import frame_reader
+
+TABLE = 'bench_read_polen_sence_data'
+QUERY = f'SELECT * FROM {TABLE}'
+
+
+def fill_table(engine, rows):
+    with engine.begin() as connection:
+        connection.execute(text(f'DROP TABLE IF EXISTS {TABLE}'))
+        connection.execute(text(
+            f'CREATE TABLE {TABLE} (id serial, time timestamp, pollen real, mold real, plastic_particles real)'
+        ))
+        connection.execute(text(f"""
+            INSERT INTO {TABLE} (time, pollen, mold, plastic_particles)
+            SELECT timestamp '2020-01-01' + n * interval '1 minute', random() * 500, random() * 50, random() * 5
+            FROM generate_series(1, :rows) AS n
+        """), {"rows": rows})
+
+
+def read_sql(conn):
+    return len(pd.read_sql(text(QUERY), conn))
+
+
+def read_arrow(conn):
+    return len(frame_reader.read_frame(conn, QUERY))
+
+
+def parquet_rows(conn):
+    output, row_count = write_parquet(*iter_record_batches(conn, QUERY))
+    output.close()
+    return row_count
+
+
+def parquet_arrow(conn):
+    output, row_count = write_parquet(*iter_arrow_batches(conn, QUERY))
+    output.close()
+    return row_count
+
+
+def best_time(func, engine, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        with engine.connect() as conn:
+            start = time.perf_counter()
+            func(conn)
+            best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Throughput of read_sql and the Arrow COPY read backend')
+    parser.add_argument('--rows', type=int, nargs='+', default=[100000, 1000000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    if not arrow_reader.arrow_reads_enabled():
+        print('pyarrow is not installed (or READ_BACKEND=pandas); nothing to compare')
+        return 1
+
+    engine = get_engine()
+    print(f"{'rows':>9} {'path':>22} {'seconds':>8} {'rows/s':>11} {'speedup':>8}")
+    try:
+        for rows in args.rows:
+            fill_table(engine, rows)
+            for name, baseline, arrow in [('DataFrame', read_sql, read_arrow),
+                                          ('parquet export', parquet_rows, parquet_arrow)]:
+                old = best_time(baseline, engine, args.repeat)
+                new = best_time(arrow, engine, args.repeat)
+                print(f"{rows:>9} {name + ' (rows)':>22} {old:>8.2f} {rows / old:>11,.0f}")
+                print(f"{rows:>9} {name + ' (arrow)':>22} {new:>8.2f} {rows / new:>11,.0f} {old / new:>7.1f}x")
+    finally:
+        with engine.begin() as connection:
+            connection.execute(text(f'DROP TABLE IF EXISTS {TABLE}'))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,92 @@
+import os
+import sys
+import time
+import argparse
+import datetime
+from sqlalchemy import text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Minute data has more values per day than a lossless sketch holds, so exact mode would skip the rollups.
+# The statistic names are fixed at import time, so the mode is set before the imports.
+os.environ.setdefault('STATS_QUANTILES', 'sketch')
+
+from db import get_engine
+from sql_aggregates import column_statistics
+import rollups
+
+TABLE = 'bench_rollup_polen_sence_data'
+COLUMNS = ['pollen', 'mold', 'plastic_particles']
+
+
+def fill_table(engine, days, minutes_per_row):
+    with engine.begin() as connection:
+        connection.execute(text(f'DROP TABLE IF EXISTS {TABLE}'))
+        connection.execute(text(
+            f'CREATE TABLE {TABLE} (id serial, time timestamp, pollen real, mold real, plastic_particles real)'
+        ))
+        connection.execute(text(f"""
+            INSERT INTO {TABLE} (time, pollen, mold, plastic_particles)
+            SELECT t, random() * 500 * (1 + sin(extract(doy FROM t) / 58.0)), random() * 50, random() * 5
+            FROM generate_series(timestamp '2023-01-01', timestamp '2023-01-01' + :days * interval '1 day'
+                                 - interval '1 second', :step * interval '1 minute') AS t
+        """), {"days": days, "step": minutes_per_row})
+        connection.execute(text(f'CREATE INDEX ON {TABLE} (time)'))
+        return connection.execute(text(f'SELECT count(*) FROM {TABLE}')).scalar()
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare raw-table and rollup statistics over a date range')
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--minutes-per-row', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    engine = get_engine()
+    rollups.ROLLUP_SOURCES[TABLE] = {'date_column': 'time'}
+
+    raw_rows = fill_table(engine, args.days, args.minutes_per_row)
+    _, build_seconds = timed(lambda: rollups.rebuild_rollups(TABLE, engine))
+
+    start_day = datetime.date(2023, 1, 1)
+    bounds = (start_day, start_day + datetime.timedelta(days=args.days - 1))
+    where_sql = ' WHERE "time" >= :range_start AND "time" < :range_end'
+    params = {"range_start": bounds[0], "range_end": bounds[1] + datetime.timedelta(days=1)}
+
+    with engine.connect() as conn:
+        rollup_rows = conn.execute(text(f'SELECT count(*) FROM {rollups.ROLLUP_TABLE} WHERE table_name = :t'),
+                                   {"t": TABLE}).scalar()
+        raw_times, rollup_times = [], []
+        for _ in range(args.repeat):
+            raw_stats, seconds = timed(lambda: column_statistics(conn, TABLE, COLUMNS, where_sql, params)[None])
+            raw_times.append(seconds)
+            rollup_stats, seconds = timed(lambda: rollups.read_rollup_statistics(conn, TABLE, COLUMNS, bounds))
+            rollup_times.append(seconds)
+
+    with engine.begin() as connection:
+        connection.execute(text(f'DELETE FROM {rollups.ROLLUP_TABLE} WHERE table_name = :t'), {"t": TABLE})
+        connection.execute(text(f'DELETE FROM {rollups.ROLLUP_STATE_TABLE} WHERE table_name = :t'), {"t": TABLE})
+        connection.execute(text(f'DROP TABLE IF EXISTS {TABLE}'))
+
+    print()
+    print(f"raw rows: {raw_rows}, rollup rows: {rollup_rows}, rollup build: {build_seconds:.2f}s")
+    print(f"raw aggregate:    {min(raw_times) * 1000:8.1f} ms")
+    print(f"rollup aggregate: {min(rollup_times) * 1000:8.1f} ms")
+    if rollup_stats is None:
+        print("rollups not used: some days hold more values than QUANTILE_SKETCH_SIZE (try STATS_QUANTILES=sketch)")
+        return
+
+    print()
+    print("max relative difference (rollup vs raw):")
+    relative = ((rollup_stats - raw_stats).abs() / raw_stats.abs()).max()
+    for name, value in relative.items():
+        print(f"  {name:<20} {value:.2e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+import os
+import sys
+import time
+import argparse
+import resource
+import multiprocessing
+from sqlalchemy import text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import get_engine
+
+TABLE = 'bench_stream_polen_sence_data'
+MOMENT_NAMES = ['Average', 'Min', 'Max', 'Standard Deviation']
+
+
+def fill_table(engine, rows):
+    with engine.begin() as connection:
+        connection.execute(text(f'DROP TABLE IF EXISTS {TABLE}'))
+        connection.execute(text(
+            f'CREATE TABLE {TABLE} (id serial, time timestamp, pollen real, mold real, plastic_particles real)'
+        ))
+        connection.execute(text(f"""
+            INSERT INTO {TABLE} (time, pollen, mold, plastic_particles)
+            SELECT timestamp '2020-01-01' + n * interval '1 minute', random() * 500, random() * 50, random() * 5
+            FROM generate_series(1, :rows) AS n
+        """), {"rows": rows})
+
+
+def max_rss_mb():
+    # ru_maxrss is reported in kilobytes on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def whole_table_statistics(streaming):
+    # Runs in a fresh process, so ru_maxrss only reflects this one request.
+    import stream_stats
+    import statistics
+
+    stream_stats.STATS_STREAMING = 'on' if streaming else 'off'
+    baseline = max_rss_mb()
+
+    start = time.perf_counter()
+    _, stats = statistics.fetch_statistics_pandas(TABLE)
+    seconds = time.perf_counter() - start
+
+    return max_rss_mb() - baseline, seconds, stats
+
+
+def measure(streaming):
+    with multiprocessing.get_context('spawn').Pool(1) as pool:
+        return pool.apply(whole_table_statistics, (streaming,))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Peak RSS of whole-table statistics: in-memory vs streaming')
+    parser.add_argument('--rows', type=int, nargs='+', default=[100000, 1000000, 4000000])
+    args = parser.parse_args()
+
+    engine = get_engine()
+    print(f"{'rows':>9} {'engine':>10} {'peak RSS MB':>12} {'seconds':>8} {'max rel diff':>13} {'median diff':>12}")
+    try:
+        for rows in args.rows:
+            fill_table(engine, rows)
+            in_memory = measure(False)
+            streaming = measure(True)
+
+            relative = (streaming[2] - in_memory[2]).abs() / in_memory[2].abs()
+            moments = relative[MOMENT_NAMES].max().max()
+            median = relative['Median'].max()
+            print(f"{rows:>9} {'in-memory':>10} {in_memory[0]:>12.1f} {in_memory[1]:>8.2f}")
+            print(f"{rows:>9} {'streaming':>10} {streaming[0]:>12.1f} {streaming[1]:>8.2f} "
+                  f"{moments:>13.1e} {median:>12.1e}")
+    finally:
+        with engine.begin() as connection:
+            connection.execute(text(f'DROP TABLE IF EXISTS {TABLE}'))
+
+
+if __name__ == '__main__':
+    main()
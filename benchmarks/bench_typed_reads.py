@@ -0,0 +1,81 @@
+import os
+import sys
+import time
+import argparse
+import resource
+import multiprocessing
+from sqlalchemy import text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import get_engine
+from table_schemas import BI_HOURLY_NUMERIC_COLUMNS
+
+TABLE = 'bench_typed_ltklai_bi_hourly_data'
+PARTICLES = 40
+
+
+def fill_table(engine, days):
+    numeric_columns = ', '.join(f'"{col}" real' for col in BI_HOURLY_NUMERIC_COLUMNS)
+    values = ', '.join('round((random() * 500)::numeric, 1)' for _ in BI_HOURLY_NUMERIC_COLUMNS)
+    with engine.begin() as connection:
+        connection.execute(text(f'DROP TABLE IF EXISTS {TABLE}'))
+        connection.execute(text(f'CREATE TABLE {TABLE} (id serial, "LTKLAI" date, "Particle" text, {numeric_columns})'))
+        connection.execute(text(f"""
+            INSERT INTO {TABLE} ("LTKLAI", "Particle", {', '.join(f'"{col}"' for col in BI_HOURLY_NUMERIC_COLUMNS)})
+            SELECT day, 'Particle ' || particle, {values}
+            FROM generate_series(date '1970-01-01', date '1970-01-01' + :days - 1, interval '1 day') AS day,
+                 generate_series(1, :particles) AS particle
+        """), {"days": days, "particles": PARTICLES})
+        return connection.execute(text(f'SELECT count(*) FROM {TABLE}')).scalar()
+
+
+def max_rss_mb():
+    # ru_maxrss is reported in kilobytes on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def full_table_statistics(compact):
+    # Runs in a fresh process, so ru_maxrss only reflects this one request.
+    import frame_reader
+    import statistics
+
+    frame_reader.COMPACT_DTYPES = 'on' if compact else 'off'
+    frame_reader.CATEGORY_COLUMNS[TABLE] = ['Particle']
+    baseline = max_rss_mb()
+
+    start = time.perf_counter()
+    df, stats = statistics.fetch_statistics_pandas(TABLE)
+    seconds = time.perf_counter() - start
+
+    return max_rss_mb() - baseline, frame_reader.frame_memory(df) / (1024 * 1024), seconds, stats
+
+
+def measure(compact):
+    with multiprocessing.get_context('spawn').Pool(1) as pool:
+        return pool.apply(full_table_statistics, (compact,))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Peak RSS of full-table statistics with plain and compact dtypes')
+    parser.add_argument('--days', type=int, nargs='+', default=[1000, 5000, 20000])
+    args = parser.parse_args()
+
+    engine = get_engine()
+    print(f"{'rows':>9} {'dtypes':>8} {'frame MB':>9} {'peak RSS MB':>12} {'seconds':>8} {'max rel diff':>13}")
+    try:
+        for days in args.days:
+            rows = fill_table(engine, days)
+            plain = measure(False)
+            compact = measure(True)
+            difference = ((compact[3] - plain[3]).abs() / plain[3].abs()).max().max()
+            for name, (rss, frame, seconds, _) in [('plain', plain), ('compact', compact)]:
+                print(f"{rows:>9} {name:>8} {frame:>9.1f} {rss:>12.1f} {seconds:>8.2f} "
+                      f"{difference if name == 'compact' else 0:>13.1e}")
+    finally:
+        with engine.begin() as connection:
+            connection.execute(text(f'DROP TABLE IF EXISTS {TABLE}'))
+
+
+if __name__ == '__main__':
+    main()
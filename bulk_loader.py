@@ -0,0 +1,101 @@
+import io
+import os
+import time
+import uuid
+from sqlalchemy import text
+
+INGEST_LOADER = os.environ.get('INGEST_LOADER', 'copy')
+
+
+def staging_table_name(table_name):
+    return f'staging_{table_name}_{uuid.uuid4().hex[:12]}'
+
+
+def create_staging_table(connection, table_name, staging_name, columns):
+    # A temporary table is private to this session, so concurrent uploads to the same table cannot touch
+    # each other's rows, and PostgreSQL drops it if the process dies before cleaning up.
+    columns_str = ", ".join([f'"{col}"' for col in columns])
+    connection.execute(text(
+        f'CREATE TEMP TABLE "{staging_name}" ON COMMIT PRESERVE ROWS AS '
+        f'SELECT {columns_str} FROM "{table_name}" WITH NO DATA'
+    ))
+
+
+def dataframe_to_csv_buffer(df):
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False, header=False, na_rep='', date_format='%Y-%m-%d %H:%M:%S.%f')
+    buffer.seek(0)
+    return buffer
+
+
+def copy_dataframe(connection, df, staging_name):
+    start = time.perf_counter()
+    columns_str = ", ".join([f'"{col}"' for col in df.columns])
+
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(
+            f'COPY "{staging_name}" ({columns_str}) FROM STDIN WITH (FORMAT csv, NULL \'\')',
+            dataframe_to_csv_buffer(df)
+        )
+    finally:
+        cursor.close()
+
+    seconds = time.perf_counter() - start
+    return {
+        'rows': len(df),
+        'seconds': seconds,
+        'rows_per_sec': len(df) / seconds if seconds > 0 else float('inf'),
+    }
+
+
+def load_staging_table(connection, engine, df, table_name, staging_name, method=None, append=False):
+    method = method or INGEST_LOADER
+
+    if not append:
+        create_staging_table(connection, table_name, staging_name, list(df.columns))
+
+    if method == 'to_sql':
+        start = time.perf_counter()
+        # Through the same connection, since the temporary staging table only exists in its session.
+        df.to_sql(staging_name, connection, if_exists='append', index=False)
+        seconds = time.perf_counter() - start
+        stats = {
+            'rows': len(df),
+            'seconds': seconds,
+            'rows_per_sec': len(df) / seconds if seconds > 0 else float('inf'),
+        }
+    else:
+        stats = copy_dataframe(connection, df, staging_name)
+    connection.commit()
+
+    print(f"  - staged {stats['rows']} rows with {method} in {stats['seconds']:.2f}s "
+          f"({stats['rows_per_sec']:.0f} rows/sec)")
+    return stats
+
+
+def upsert_from_staging(connection, table_name, staging_name, columns, key_columns):
+    columns_str = ", ".join([f'"{col}"' for col in columns])
+    keys_str = ", ".join([f'"{col}"' for col in key_columns])
+    update_columns = [col for col in columns if col not in key_columns]
+
+    if update_columns:
+        conflict_action = 'DO UPDATE SET ' + ", ".join([f'"{col}" = EXCLUDED."{col}"' for col in update_columns])
+    else:
+        conflict_action = 'DO NOTHING'
+
+    # DISTINCT ON keeps the last row of the file for each key; ON CONFLICT cannot touch a row twice.
+    upsert_query = f"""
+    WITH merged AS (
+        INSERT INTO "{table_name}" ({columns_str})
+        SELECT DISTINCT ON ({keys_str}) {columns_str} FROM "{staging_name}"
+        ORDER BY {keys_str}, ctid DESC
+        ON CONFLICT ({keys_str}) {conflict_action}
+        RETURNING (xmax = 0) AS inserted
+    )
+    SELECT count(*) FILTER (WHERE inserted), count(*) FILTER (WHERE NOT inserted) FROM merged
+    """
+
+    insert_count, update_count = connection.execute(text(upsert_query)).fetchone()
+    connection.commit()
+    return insert_count, update_count
@@ -0,0 +1,187 @@
+import os
+import sys
+import argparse
+import pandas as pd
+from sqlalchemy import text
+from db import get_engine
+from stats_cache import bump_table_version
+from header_classifier import header_date, classify_headers
+from bulk_loader import staging_table_name, create_staging_table, copy_dataframe
+
+WIDE_TABLE = 'hirst_daily_particle_totals'
+LONG_TABLE = 'hirst_daily_particle_values'
+
+DAILY_TOTALS_STORAGE = os.environ.get('DAILY_TOTALS_STORAGE', 'wide')
+
+LONG_COLUMNS = ['station', 'particle', 'date', 'value']
+
+
+def use_long_storage():
+    return DAILY_TOTALS_STORAGE == 'long'
+
+
+def melt_date_columns(df, date_columns=None):
+    if date_columns is None:
+        date_columns = list(classify_headers(df.columns)['dates'])
+    id_columns = [col for col in df.columns if col not in date_columns]
+
+    long_df = df.melt(id_vars=id_columns, value_vars=date_columns, var_name='date', value_name='value')
+    date_labels = {col: header_date(col).strftime('%Y-%m-%d') for col in date_columns}
+    long_df['date'] = long_df['date'].map(date_labels)
+
+    return long_df
+
+
+def ensure_long_table(conn):
+    conn.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS {LONG_TABLE} (
+            station text NOT NULL,
+            particle text NOT NULL,
+            date date NOT NULL,
+            value real,
+            PRIMARY KEY (station, particle, date)
+        )
+    """))
+    conn.execute(text(f'CREATE INDEX IF NOT EXISTS idx_{LONG_TABLE}_date ON {LONG_TABLE} (date)'))
+
+
+def build_long_filter(station=None, bounds=None):
+    conditions = []
+    params = {}
+
+    if station:
+        conditions.append('station = :station')
+        params["station"] = station
+    if bounds:
+        conditions.append('date BETWEEN :range_start AND :range_end')
+        params["range_start"] = bounds[0]
+        params["range_end"] = bounds[1]
+
+    where_sql = ' WHERE ' + ' AND '.join(conditions) if conditions else ''
+    return where_sql, params
+
+
+def pivot_to_wide(long_df):
+    if long_df.empty:
+        return pd.DataFrame(columns=['station', 'particle'])
+
+    long_df = long_df.copy()
+    long_df['date'] = pd.to_datetime(long_df['date']).dt.strftime('%Y-%m-%d')
+    wide_df = long_df.pivot(index=['station', 'particle'], columns='date', values='value')
+    wide_df.columns.name = None
+
+    return wide_df.reset_index()
+
+
+def read_daily_totals_wide(conn, station=None, bounds=None):
+    where_sql, params = build_long_filter(station, bounds)
+    query = text(f'SELECT station, particle, date, value FROM {LONG_TABLE}{where_sql} ORDER BY station, particle, date')
+    return pivot_to_wide(pd.read_sql(query, conn, params=params))
+
+
+def read_daily_totals_page(conn, limit, offset, sort_by='station', sort_dir='asc'):
+    if sort_by not in ['station', 'particle']:
+        sort_by = 'station'
+    secondary = 'particle' if sort_by == 'station' else 'station'
+
+    total_rows = conn.execute(
+        text(f'SELECT COUNT(*) FROM (SELECT DISTINCT station, particle FROM {LONG_TABLE}) AS keys')
+    ).scalar()
+
+    query = text(f"""
+        WITH page AS (
+            SELECT DISTINCT station, particle FROM {LONG_TABLE}
+            ORDER BY {sort_by} {sort_dir}, {secondary}
+            LIMIT :limit OFFSET :offset
+        )
+        SELECT v.station, v.particle, v.date, v.value
+        FROM {LONG_TABLE} v
+        JOIN page USING (station, particle)
+    """)
+    df = pivot_to_wide(pd.read_sql(query, conn, params={"limit": limit, "offset": offset}))
+    if not df.empty:
+        df = df.sort_values(by=[sort_by, secondary], ascending=[sort_dir == 'asc', True])
+
+    return df, total_rows
+
+
+def get_long_stations(conn):
+    return [row[0] for row in conn.execute(text(f'SELECT DISTINCT station FROM {LONG_TABLE} ORDER BY station'))]
+
+
+def skipped_wide_columns(columns):
+    return [col for col in classify_headers(columns)['other'] if col not in ('id', 'station', 'particle')]
+
+
+def store_daily_totals_long(df, engine, report_skipped=True):
+    date_columns = list(classify_headers(df.columns)['dates'])
+    if report_skipped:
+        skipped = skipped_wide_columns(df.columns)
+        if skipped:
+            print(f"Skipped columns that are not dates: {skipped}")
+
+    long_df = melt_date_columns(df[['station', 'particle'] + date_columns], date_columns)
+    long_df['value'] = pd.to_numeric(long_df['value'], errors='coerce')
+    long_df = long_df.dropna(subset=['station', 'particle', 'value'])
+    # Two headers for the same day (e.g. 2024-05-02 and 05/02/2024) would make ON CONFLICT hit a row twice.
+    long_df = long_df.drop_duplicates(subset=['station', 'particle', 'date'], keep='last')[LONG_COLUMNS]
+
+    with engine.begin() as conn:
+        ensure_long_table(conn)
+        if not long_df.empty:
+            staging_name = staging_table_name(LONG_TABLE)
+            create_staging_table(conn, LONG_TABLE, staging_name, LONG_COLUMNS)
+            copy_dataframe(conn, long_df, staging_name)
+            conn.execute(text(f"""
+                INSERT INTO {LONG_TABLE} (station, particle, date, value)
+                SELECT station, particle, date, value FROM "{staging_name}"
+                ON CONFLICT (station, particle, date) DO UPDATE SET value = EXCLUDED.value
+            """))
+            conn.execute(text(f'DROP TABLE "{staging_name}"'))
+
+    print(f"Data processed for '{LONG_TABLE}' table:")
+    print(f"  - {len(df)} rows in file")
+    print(f"  - {len(long_df)} (station, particle, date) values upserted")
+
+    return len(long_df)
+
+
+def migrate_from_wide(engine=None, chunk_size=50):
+    engine = engine or get_engine()
+    migrated = 0
+    skipped = []
+
+    with engine.connect() as conn:
+        for chunk in pd.read_sql(text(f'SELECT * FROM {WIDE_TABLE} ORDER BY station, particle'), conn,
+                                 chunksize=chunk_size):
+            skipped = skipped_wide_columns(chunk.columns)
+            migrated += store_daily_totals_long(chunk, engine, report_skipped=False)
+
+    with engine.begin() as conn:
+        bump_table_version(conn, WIDE_TABLE)
+
+    print(f"Migrated {migrated} values from {WIDE_TABLE} to {LONG_TABLE}")
+    if skipped:
+        print(f"Skipped {len(skipped)} columns of {WIDE_TABLE} that are not dates: {skipped}")
+    return migrated
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Long-format storage for HIRST daily particle totals')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('init', help=f'create {LONG_TABLE} and its indexes')
+    migrate_parser = subparsers.add_parser('migrate', help=f'copy {WIDE_TABLE} into {LONG_TABLE}')
+    migrate_parser.add_argument('--chunk-size', type=int, default=50)
+    args = parser.parse_args(argv)
+
+    engine = get_engine()
+    if args.command == 'init':
+        with engine.begin() as conn:
+            ensure_long_table(conn)
+        print(f"Table {LONG_TABLE} is ready")
+    elif args.command == 'migrate':
+        migrate_from_wide(engine, args.chunk_size)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
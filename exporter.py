@@ -0,0 +1,200 @@
+import os
+import datetime
+import tempfile
+import itertools
+import xlsxwriter
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from arrow_reader import ARROW_TYPES, arrow_type, arrow_reads_enabled, iter_arrow_batches
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+EXPORT_BATCH_ROWS = int(os.environ.get('EXPORT_BATCH_ROWS', 5000))
+EXPORT_WIDTH_SAMPLE_ROWS = int(os.environ.get('EXPORT_WIDTH_SAMPLE_ROWS', 1000))
+EXPORT_SPOOL_BYTES = int(os.environ.get('EXPORT_SPOOL_BYTES', 8 * 1024 * 1024))
+
+PARQUET_COMPRESSION = os.environ.get('PARQUET_COMPRESSION', 'zstd')
+
+XLSX_MIMETYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+EXPORT_FORMATS = ['xlsx', 'csv', 'parquet']
+
+EXPORT_MIMETYPES = {
+    'xlsx': XLSX_MIMETYPE,
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+
+def get_export_formats():
+    return [fmt for fmt in EXPORT_FORMATS if fmt != 'parquet' or pa is not None]
+
+
+def iter_query_batches(conn, query, params=None, batch_size=None):
+    batch_size = batch_size or EXPORT_BATCH_ROWS
+    # stream_results makes psycopg2 use a named (server-side) cursor, so only one batch is held at a time.
+    result = conn.execution_options(stream_results=True, max_row_buffer=batch_size).execute(
+        text(query) if isinstance(query, str) else query, params or {}
+    )
+    columns = list(result.keys())
+
+    def batches():
+        for partition in result.partitions(batch_size):
+            yield [tuple(row) for row in partition]
+
+    return columns, batches()
+
+
+def iter_frame_batches(df, batch_size=None):
+    batch_size = batch_size or EXPORT_BATCH_ROWS
+    # float32 values are widened through their shortest decimal form, so a stored 0.1 is written as 0.1
+    # rather than 0.10000000149011612.
+    float32_columns = {col: 'float64' for col in df.columns if df[col].dtype == 'float32'}
+
+    def batches():
+        for start in range(0, len(df), batch_size):
+            batch = df.iloc[start:start + batch_size]
+            if float32_columns:
+                batch = batch.astype({col: 'str' for col in float32_columns}).astype(float32_columns)
+            yield list(batch.itertuples(index=False, name=None))
+
+    return list(df.columns), batches()
+
+
+def clean_value(value):
+    # Nullable Int/boolean columns from the typed reader hold pd.NA and numpy scalars.
+    if value is None or value is pd.NA:
+        return None
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and value != value:
+        return None
+    if isinstance(value, datetime.datetime) and value != value:
+        return None
+    return value
+
+
+def new_spooled_file():
+    return tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_BYTES)
+
+
+def estimate_column_widths(columns, sample_rows):
+    widths = []
+    for i, col in enumerate(columns):
+        max_len = max([len(str(col))] + [len(str(row[i])) for row in sample_rows if row[i] is not None])
+        widths.append(min(max(max_len + 2, 10), 50))
+    return widths
+
+
+def write_xlsx(columns, batches, sheet_name):
+    output = new_spooled_file()
+
+    # constant_memory flushes each row to disk as soon as the next one starts.
+    workbook = xlsxwriter.Workbook(output, {'constant_memory': True, 'remove_timezone': True})
+    worksheet = workbook.add_worksheet(sheet_name[:31])
+    header_format = workbook.add_format({'bold': True, 'border': 1, 'align': 'center'})
+    datetime_format = workbook.add_format({'num_format': 'yyyy-mm-dd hh:mm:ss'})
+    date_format = workbook.add_format({'num_format': 'yyyy-mm-dd'})
+
+    batches = iter(batches)
+    first_batch = next(batches, [])
+    sample_rows = first_batch[:EXPORT_WIDTH_SAMPLE_ROWS]
+    for i, width in enumerate(estimate_column_widths(columns, sample_rows)):
+        worksheet.set_column(i, i, width)
+
+    worksheet.write_row(0, 0, columns, header_format)
+
+    row_num = 0
+    for batch in itertools.chain([first_batch], batches):
+        for row in batch:
+            row_num += 1
+            for col_num, value in enumerate(row):
+                value = clean_value(value)
+                if value is None:
+                    continue
+                if isinstance(value, datetime.datetime):
+                    worksheet.write_datetime(row_num, col_num, value, datetime_format)
+                elif isinstance(value, datetime.date):
+                    worksheet.write_datetime(row_num, col_num, value, date_format)
+                else:
+                    worksheet.write(row_num, col_num, value)
+
+    workbook.close()
+    output.seek(0)
+    return output, row_num
+
+
+def copy_query_to_csv(conn, query):
+    output = new_spooled_file()
+    cursor = conn.connection.cursor()
+    try:
+        cursor.copy_expert(f'COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER)', output)
+        row_count = cursor.rowcount
+    finally:
+        cursor.close()
+
+    output.seek(0)
+    return output, row_count
+
+
+def iter_record_batches(conn, query, batch_size=None):
+    batch_size = batch_size or EXPORT_BATCH_ROWS
+    result = conn.execution_options(stream_results=True, max_row_buffer=batch_size).execute(text(query))
+    description = result.cursor.description
+    schema = pa.schema([(column[0], arrow_type(column[1])) for column in description])
+    text_columns = [i for i, column in enumerate(description) if column[1] not in ARROW_TYPES]
+    numeric_columns = [i for i, column in enumerate(description) if column[1] == 1700]
+
+    def batches():
+        for partition in result.partitions(batch_size):
+            columns = [list(values) for values in zip(*partition)]
+            for i in text_columns:
+                columns[i] = [None if v is None else str(v) for v in columns[i]]
+            for i in numeric_columns:
+                columns[i] = [None if v is None else float(v) for v in columns[i]]
+            yield pa.RecordBatch.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)], schema=schema
+            )
+
+    return schema, batches()
+
+
+def write_parquet(schema, record_batches):
+    output = new_spooled_file()
+    row_count = 0
+
+    with pq.ParquetWriter(output, schema, compression=PARQUET_COMPRESSION) as writer:
+        for batch in record_batches:
+            writer.write_batch(batch)
+            row_count += batch.num_rows
+
+    output.seek(0)
+    return output, row_count
+
+
+def export_query(conn, query, export_format, sheet_name):
+    if export_format == 'csv':
+        return copy_query_to_csv(conn, query)
+    if export_format == 'parquet':
+        if arrow_reads_enabled():
+            return write_parquet(*iter_arrow_batches(conn, query))
+        return write_parquet(*iter_record_batches(conn, query))
+    return write_xlsx(*iter_query_batches(conn, query), sheet_name)
+
+
+def export_frame(df, export_format, sheet_name):
+    if export_format == 'csv':
+        output = new_spooled_file()
+        output.write(df.to_csv(index=False).encode('utf-8'))
+        output.seek(0)
+        return output, len(df)
+    if export_format == 'parquet':
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        return write_parquet(table.schema, table.to_batches(max_chunksize=EXPORT_BATCH_ROWS))
+    return write_xlsx(*iter_frame_batches(df), sheet_name)
@@ -0,0 +1,108 @@
+import os
+import pandas as pd
+from pandas.api.types import union_categoricals
+from sqlalchemy import text
+from schema_cache import get_column_types
+from table_schemas import HIRST_STATIONS, hirst_table_name
+from arrow_reader import pa, arrow_reads_enabled, read_arrow_table
+
+COMPACT_DTYPES = os.environ.get('COMPACT_DTYPES', 'on')
+READ_CHUNK_ROWS = int(os.environ.get('READ_CHUNK_ROWS', 20000))
+
+# PostgreSQL data types (information_schema spelling) and the pandas dtype each column is read into.
+PG_DTYPES = {
+    'real': 'float32',
+    'double precision': 'float64',
+    'numeric': 'float64',
+    'smallint': 'Int16',
+    'integer': 'Int32',
+    'bigint': 'Int64',
+    'boolean': 'boolean',
+    'date': 'datetime64[s]',
+    'timestamp without time zone': 'datetime64[us]',
+}
+
+# Text columns with only a handful of distinct values, read as pandas categoricals.
+CATEGORY_COLUMNS = {hirst_table_name(station): ['Particle'] for station in HIRST_STATIONS}
+CATEGORY_COLUMNS['hirst_daily_particle_totals'] = ['station', 'particle']
+CATEGORY_COLUMNS['hirst_daily_particle_values'] = ['station', 'particle']
+
+
+def compact_dtypes_enabled():
+    return COMPACT_DTYPES == 'on'
+
+
+def get_dtype_map(conn, table_name):
+    column_types = get_column_types(conn, table_name)
+    dtypes = {col: PG_DTYPES[data_type] for col, data_type in column_types.items() if data_type in PG_DTYPES}
+    for col in CATEGORY_COLUMNS.get(table_name, []):
+        if col in column_types:
+            dtypes[col] = 'category'
+    return dtypes
+
+
+def apply_dtypes(df, dtypes):
+    converted = {}
+    for col, dtype in dtypes.items():
+        if col not in df.columns or str(df[col].dtype) == dtype:
+            continue
+        try:
+            converted[col] = df[col].astype(dtype)
+        except (ValueError, TypeError) as e:
+            print(f"Keeping {col} as {df[col].dtype}: {e}")
+    return df.assign(**converted) if converted else df
+
+
+def concat_frames(frames):
+    if len(frames) == 1:
+        return frames[0]
+
+    columns = frames[0].columns
+    categorical = [col for col in columns if isinstance(frames[0][col].dtype, pd.CategoricalDtype)]
+    # pd.concat turns categoricals with different categories back into strings, so they are unioned separately.
+    df = pd.concat([frame.drop(columns=categorical) for frame in frames], ignore_index=True)
+    for col in categorical:
+        df[col] = union_categoricals([frame[col] for frame in frames], sort_categories=True)
+    return df[columns]
+
+
+def frame_memory(df):
+    return int(df.memory_usage(deep=True).sum())
+
+
+def report_memory(df, label):
+    print(f"Read {len(df)} rows from {label}: {frame_memory(df) / (1024 * 1024):.1f} MB in memory")
+
+
+def read_chunked_frame(conn, query, dtypes, params=None):
+    # Rows arrive from a server-side cursor and each chunk is compacted before the next one is read,
+    # so the untyped object frame never exists for the whole result at once.
+    streaming_conn = conn.execution_options(stream_results=True, max_row_buffer=READ_CHUNK_ROWS)
+    frames = [apply_dtypes(chunk, dtypes)
+              for chunk in pd.read_sql(query, streaming_conn, params=params, chunksize=READ_CHUNK_ROWS)]
+    return concat_frames(frames) if frames else pd.DataFrame()
+
+
+def read_frame(conn, query, params=None, dtypes=None):
+    query = text(query) if isinstance(query, str) else query
+
+    if arrow_reads_enabled():
+        try:
+            df = read_arrow_table(conn, query, params).to_pandas(split_blocks=True, self_destruct=True)
+            return apply_dtypes(df, dtypes) if dtypes else df
+        except pa.ArrowException as e:
+            print(f"Arrow read failed, falling back to read_sql: {e}")
+
+    if dtypes:
+        return read_chunked_frame(conn, query, dtypes, params)
+    return pd.read_sql(query, conn, params=params)
+
+
+def read_typed_frame(conn, query, table_name, params=None):
+    if compact_dtypes_enabled():
+        df = read_frame(conn, query, params, get_dtype_map(conn, table_name))
+    else:
+        df = pd.read_sql(text(query) if isinstance(query, str) else query, conn, params=params)
+
+    report_memory(df, table_name)
+    return df
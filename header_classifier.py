@@ -0,0 +1,78 @@
+import re
+import datetime
+
+HEADER_CACHE_SIZE = 100000
+
+TIME_PERIOD_COLUMNS = ['00-02', '02-04', '04-06', '06-08', '08-10', '10-12',
+                       '12-14', '14-16', '16-18', '18-20', '20-22', '22-24']
+
+# Date header shapes seen in uploaded sheets, each with the formats that can parse it. The regexes
+# reject ordinary headers quickly; strptime then rejects impossible dates such as 2024-13-45.
+DATE_HEADER_FORMATS = [
+    (re.compile(r'^\d{4}-\d{1,2}-\d{1,2}$'), ['%Y-%m-%d']),
+    (re.compile(r'^\d{4}-\d{1,2}-\d{1,2}[ T]\d{1,2}:\d{2}(:\d{2}(\.\d+)?)?$'),
+     ['%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M:%S.%f', '%Y-%m-%d %H:%M', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%dT%H:%M']),
+    (re.compile(r'^\d{4}/\d{1,2}/\d{1,2}$'), ['%Y/%m/%d']),
+    (re.compile(r'^\d{1,2}/\d{1,2}/\d{4}$'), ['%m/%d/%Y', '%d/%m/%Y']),
+    (re.compile(r'^\d{1,2}\.\d{1,2}\.\d{4}$'), ['%d.%m.%Y', '%m.%d.%Y']),
+    (re.compile(r'^\d{1,2}-\d{1,2}-\d{4}$'), ['%d-%m-%Y', '%m-%d-%Y']),
+    (re.compile(r'^[A-Za-z]{3,9} \d{1,2},? \d{4}$'), ['%b %d %Y', '%B %d %Y', '%b %d, %Y', '%B %d, %Y']),
+    (re.compile(r'^\d{1,2} [A-Za-z]{3,9} \d{4}$'), ['%d %b %Y', '%d %B %Y']),
+]
+
+_header_dates = {}
+
+
+def parse_header_date(col):
+    if isinstance(col, datetime.datetime):
+        return col.date()
+    if isinstance(col, datetime.date):
+        return col
+    if not isinstance(col, str):
+        return None
+
+    text = col.strip()
+    for pattern, formats in DATE_HEADER_FORMATS:
+        if not pattern.match(text):
+            continue
+        for date_format in formats:
+            try:
+                return datetime.datetime.strptime(text, date_format).date()
+            except ValueError:
+                continue
+        return None
+    return None
+
+
+def header_date(col):
+    try:
+        return _header_dates[col]
+    except KeyError:
+        pass
+    except TypeError:
+        return parse_header_date(col)
+
+    if len(_header_dates) >= HEADER_CACHE_SIZE:
+        _header_dates.clear()
+    day = _header_dates[col] = parse_header_date(col)
+    return day
+
+
+def is_date_header(col):
+    return header_date(col) is not None
+
+
+def classify_headers(columns):
+    dates = {}
+    periods = []
+    other = []
+    for col in columns:
+        day = header_date(col)
+        if day is not None:
+            dates[col] = day
+        elif col in TIME_PERIOD_COLUMNS:
+            periods.append(col)
+        else:
+            other.append(col)
+
+    return {'dates': dates, 'periods': periods, 'other': other}
@@ -0,0 +1,248 @@
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
+from db import get_engine
+from uploader import ingest_file
+
+INGEST_MODE = os.environ.get('INGEST_MODE', 'async')
+INGEST_WORKERS = int(os.environ.get('INGEST_WORKERS', 2))
+# Jobs still 'running' this long after they started are assumed lost with their worker.
+INGEST_STALE_MINUTES = int(os.environ.get('INGEST_STALE_MINUTES', 60))
+
+JOBS_TABLE = 'ingest_jobs'
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def ensure_jobs_table(conn):
+    conn.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS {JOBS_TABLE} (
+            id serial PRIMARY KEY,
+            filename text NOT NULL,
+            filepath text NOT NULL,
+            table_name text,
+            status text NOT NULL DEFAULT 'queued',
+            stage text NOT NULL DEFAULT 'queued',
+            result jsonb,
+            timings jsonb NOT NULL DEFAULT '{{}}'::jsonb,
+            error text,
+            created_at timestamp NOT NULL DEFAULT now(),
+            started_at timestamp,
+            finished_at timestamp
+        )
+    """))
+    conn.execute(text(f'CREATE INDEX IF NOT EXISTS idx_{JOBS_TABLE}_queued ON {JOBS_TABLE} (id) '
+                      f"WHERE status = 'queued'"))
+
+
+def enqueue_job(filepath, filename, table_name=None):
+    with get_engine().begin() as conn:
+        ensure_jobs_table(conn)
+        return conn.execute(text(f"""
+            INSERT INTO {JOBS_TABLE} (filename, filepath, table_name)
+            VALUES (:filename, :filepath, :table_name)
+            RETURNING id
+        """), {"filename": filename, "filepath": os.path.abspath(filepath), "table_name": table_name}).scalar()
+
+
+def get_job(job_id):
+    # The table is created at startup and on enqueue, so status polls only read it.
+    with get_engine().connect() as conn:
+        try:
+            row = conn.execute(text(f'SELECT * FROM {JOBS_TABLE} WHERE id = :id'),
+                               {"id": job_id}).mappings().fetchone()
+        except ProgrammingError:
+            # No job has been queued since the jobs table was introduced.
+            return None
+
+    if row is None:
+        return None
+
+    job = dict(row)
+    for key in ['created_at', 'started_at', 'finished_at']:
+        if job[key] is not None:
+            job[key] = job[key].isoformat()
+    return job
+
+
+def claim_job(conn, job_id=None):
+    # SKIP LOCKED lets the in-app pool and standalone workers share the queue safely.
+    job_filter = 'AND id = :id' if job_id is not None else ''
+    return conn.execute(text(f"""
+        UPDATE {JOBS_TABLE}
+        SET status = 'running', stage = 'starting', started_at = now()
+        WHERE id = (
+            SELECT id FROM {JOBS_TABLE}
+            WHERE status = 'queued' {job_filter}
+            ORDER BY id
+            FOR UPDATE SKIP LOCKED
+            LIMIT 1
+        )
+        RETURNING id, filepath, table_name
+    """), {"id": job_id}).fetchone()
+
+
+class JobProgress:
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self.timings = {}
+        self.stage = 'starting'
+        self.stage_started = time.perf_counter()
+
+    def close_stage(self):
+        # A stage can be reported once per chunk, so its time is accumulated rather than overwritten.
+        elapsed = time.perf_counter() - self.stage_started
+        self.timings[self.stage] = round(self.timings.get(self.stage, 0) + elapsed, 3)
+
+    def __call__(self, stage, **info):
+        self.close_stage()
+        self.stage = stage
+        self.stage_started = time.perf_counter()
+
+        with get_engine().begin() as conn:
+            conn.execute(text(f"""
+                UPDATE {JOBS_TABLE}
+                SET stage = :stage, timings = CAST(:timings AS jsonb),
+                    result = coalesce(result, '{{}}'::jsonb) || CAST(:info AS jsonb),
+                    table_name = coalesce(:table_name, table_name)
+                WHERE id = :id
+            """), {"id": self.job_id, "stage": stage, "timings": json.dumps(self.timings),
+                   "info": json.dumps(info, default=str), "table_name": info.get('table_name')})
+
+    def finish(self, status, result=None, error=None):
+        self.close_stage()
+        with get_engine().begin() as conn:
+            conn.execute(text(f"""
+                UPDATE {JOBS_TABLE}
+                SET status = :status, stage = :status, finished_at = now(), error = :error,
+                    timings = CAST(:timings AS jsonb),
+                    result = coalesce(result, '{{}}'::jsonb) || CAST(:result AS jsonb)
+                WHERE id = :id
+            """), {"id": self.job_id, "status": status, "error": error, "timings": json.dumps(self.timings),
+                   "result": json.dumps(result or {}, default=str)})
+
+
+def fail_job(job_id, error):
+    with get_engine().begin() as conn:
+        conn.execute(text(f"""
+            UPDATE {JOBS_TABLE}
+            SET status = 'failed', stage = 'failed', finished_at = now(), error = :error
+            WHERE id = :id AND status IN ('queued', 'running')
+        """), {"id": job_id, "error": error})
+
+
+def recover_stale_jobs(stale_minutes=None):
+    stale_minutes = stale_minutes or INGEST_STALE_MINUTES
+    with get_engine().begin() as conn:
+        ensure_jobs_table(conn)
+        recovered = conn.execute(text(f"""
+            UPDATE {JOBS_TABLE}
+            SET status = 'failed', stage = 'failed', finished_at = now(),
+                error = 'Worker stopped before the job finished'
+            WHERE status = 'running' AND started_at < now() - make_interval(mins => :stale_minutes)
+        """), {"stale_minutes": stale_minutes}).rowcount
+
+    if recovered:
+        print(f"Marked {recovered} interrupted ingest job(s) as failed")
+    return recovered
+
+
+def run_job(job_id=None):
+    with get_engine().begin() as conn:
+        claimed = claim_job(conn, job_id)
+
+    if claimed is None:
+        return None
+
+    job_id, filepath, table_name = claimed
+    progress = JobProgress(job_id)
+
+    try:
+        result = ingest_file(filepath, table_name, progress=progress)
+        progress.finish('done', result)
+        return job_id
+    except Exception as e:
+        progress.finish('failed', error=str(e))
+        if os.path.exists(filepath):
+            try:
+                os.remove(filepath)
+            except OSError:
+                pass
+        return job_id
+
+
+def get_executor():
+    global _executor, _executor_pid
+
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ProcessPoolExecutor(max_workers=INGEST_WORKERS,
+                                            mp_context=multiprocessing.get_context('spawn'))
+            _executor_pid = os.getpid()
+    return _executor
+
+
+def reset_executor(executor):
+    global _executor
+
+    # A broken pool stays broken, so the next upload starts a new one.
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+
+
+def job_finished(job_id, executor, future):
+    # run_job records its own errors, so an exception here means the worker process itself died.
+    error = future.exception()
+    if error is not None:
+        reset_executor(executor)
+        fail_job(job_id, f"Ingest worker failed: {error}")
+
+
+def submit_job(job_id):
+    if INGEST_WORKERS > 0:
+        executor = get_executor()
+        try:
+            future = executor.submit(run_job, job_id)
+        except Exception as e:
+            reset_executor(executor)
+            fail_job(job_id, f"Could not start ingest job: {e}")
+            raise
+        future.add_done_callback(lambda done: job_finished(job_id, executor, done))
+
+
+def worker_loop(poll_interval=2.0, once=False):
+    with get_engine().begin() as conn:
+        ensure_jobs_table(conn)
+
+    while True:
+        job_id = run_job()
+        if job_id is not None:
+            print(f"Finished ingest job {job_id}")
+            continue
+        if once:
+            break
+        time.sleep(poll_interval)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Background ingest worker')
+    parser.add_argument('--poll-interval', type=float, default=2.0)
+    parser.add_argument('--once', action='store_true', help='drain the queue and exit')
+    args = parser.parse_args(argv)
+
+    recover_stale_jobs()
+    worker_loop(args.poll_interval, args.once)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
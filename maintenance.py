@@ -0,0 +1,133 @@
+import sys
+import time
+import argparse
+from sqlalchemy import text
+from db import get_engine
+from table_schemas import TABLE_SCHEMAS
+from daily_totals_store import LONG_TABLE
+from rollups import ROLLUP_TABLE
+
+# The data tables plus the long daily-totals table and the rollups, which churn with every upload.
+MAINTAINED_TABLES = list(TABLE_SCHEMAS) + [LONG_TABLE, ROLLUP_TABLE]
+
+# CLUSTER rewrites the table, so VACUUM (ANALYZE) runs after it to set the visibility map and statistics on the
+# new heap; running it first would only work on pages CLUSTER is about to throw away.
+MAINTENANCE_STEPS = ['cluster', 'vacuum', 'reindex']
+
+DEFAULT_BLOAT_THRESHOLD = 0.2
+
+
+def get_table_health(conn, table_name):
+    row = conn.execute(text("""
+        SELECT n_live_tup, n_dead_tup, last_vacuum, last_autovacuum, last_analyze, last_autoanalyze,
+               pg_total_relation_size(relid)
+        FROM pg_stat_user_tables
+        WHERE relname = :table_name AND schemaname = 'public'
+    """), {"table_name": table_name}).fetchone()
+
+    if row is None:
+        return None
+
+    live_rows, dead_rows = row[0] or 0, row[1] or 0
+    return {
+        'table': table_name,
+        'live_rows': live_rows,
+        'dead_rows': dead_rows,
+        'dead_ratio': dead_rows / (live_rows + dead_rows) if live_rows + dead_rows else 0.0,
+        'last_vacuum': max([v for v in row[2:4] if v is not None], default=None),
+        'last_analyze': max([v for v in row[4:6] if v is not None], default=None),
+        'total_bytes': row[6],
+    }
+
+
+def get_maintenance_status(tables=None):
+    with get_engine().connect() as conn:
+        return [health for health in (get_table_health(conn, table) for table in tables or MAINTAINED_TABLES)
+                if health is not None]
+
+
+def get_cluster_index(conn, table_name):
+    for index_name in [f'idx_id_{table_name}', f'{table_name}_pkey']:
+        exists = conn.execute(text("SELECT to_regclass(:index_name) IS NOT NULL"),
+                              {"index_name": index_name}).scalar()
+        if exists:
+            return index_name
+    return None
+
+
+def run_step(conn, table_name, step):
+    if step == 'vacuum':
+        conn.execute(text(f'VACUUM (ANALYZE) "{table_name}"'))
+        return 'vacuumed and analyzed'
+    if step == 'cluster':
+        index_name = get_cluster_index(conn, table_name)
+        if index_name is None:
+            return 'skipped: no id index'
+        conn.execute(text(f'CLUSTER "{table_name}" USING "{index_name}"'))
+        return f'clustered on {index_name}'
+    if step == 'reindex':
+        conn.execute(text(f'REINDEX TABLE "{table_name}"'))
+        return 'reindexed'
+    raise ValueError(f"Unknown maintenance step: {step}")
+
+
+def run_maintenance(tables=None, steps=None, bloat_threshold=DEFAULT_BLOAT_THRESHOLD, force=False):
+    # Steps always run in MAINTENANCE_STEPS order, whatever order they were requested in.
+    steps = [step for step in MAINTENANCE_STEPS if step in (steps or MAINTENANCE_STEPS)]
+    report = []
+
+    # VACUUM cannot run inside a transaction block.
+    with get_engine().connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+        for table_name in tables or MAINTAINED_TABLES:
+            health = get_table_health(conn, table_name)
+            if health is None:
+                continue
+
+            if not force and health['dead_ratio'] < bloat_threshold:
+                report.append({'table': table_name, 'step': '-', 'seconds': 0.0,
+                               'result': f"skipped: dead ratio {health['dead_ratio']:.1%} below threshold"})
+                continue
+
+            clustered = False
+            for step in steps:
+                start = time.perf_counter()
+                if step == 'reindex' and clustered:
+                    # CLUSTER rewrites the table and rebuilds every index on it, so a REINDEX would redo that work.
+                    result = 'skipped: indexes rebuilt by cluster'
+                else:
+                    try:
+                        result = run_step(conn, table_name, step)
+                        clustered = clustered or (step == 'cluster' and result.startswith('clustered'))
+                    except Exception as e:
+                        result = f'failed: {e}'
+                report.append({'table': table_name, 'step': step,
+                               'seconds': time.perf_counter() - start, 'result': result})
+
+    return report
+
+
+def print_report(report):
+    for entry in report:
+        print(f"{entry['table']:<32} {entry['step']:<8} {entry['seconds']:>8.2f}s  {entry['result']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run CLUSTER / VACUUM ANALYZE / REINDEX on the data tables')
+    parser.add_argument('--tables', nargs='+', default=None)
+    parser.add_argument('--steps', nargs='+', choices=MAINTENANCE_STEPS, default=MAINTENANCE_STEPS)
+    parser.add_argument('--bloat-threshold', type=float, default=DEFAULT_BLOAT_THRESHOLD,
+                        help='only maintain tables whose dead tuple ratio is at least this value')
+    parser.add_argument('--force', action='store_true', help='ignore the bloat threshold')
+    parser.add_argument('--interval', type=int, default=None,
+                        help='keep running and repeat every INTERVAL seconds')
+    args = parser.parse_args(argv)
+
+    while True:
+        print_report(run_maintenance(args.tables, args.steps, args.bloat_threshold, args.force))
+        if not args.interval:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
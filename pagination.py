@@ -0,0 +1,146 @@
+import os
+import re
+import sys
+import time
+import argparse
+import pandas as pd
+from sqlalchemy import text
+from db import get_engine
+from table_schemas import TABLE_SCHEMAS
+
+ROW_COUNT_MODE = os.environ.get('ROW_COUNT_MODE', 'auto')
+EXACT_COUNT_THRESHOLD = int(os.environ.get('EXACT_COUNT_THRESHOLD', 100000))
+ROW_COUNT_CACHE_TTL = int(os.environ.get('ROW_COUNT_CACHE_TTL', 60))
+
+# Columns the table view is usually sorted by; each gets a (column, id) index for keyset paging.
+KEYSET_INDEX_COLUMNS = {table_name: schema['keyset_columns'] for table_name, schema in TABLE_SCHEMAS.items()}
+
+_row_count_cache = {}
+
+
+def estimate_row_count(conn, table_name):
+    estimate = conn.execute(text("""
+        SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table_name)
+    """), {"table_name": table_name}).scalar()
+
+    # reltuples is -1 until the table has been vacuumed or analyzed.
+    if estimate is None or estimate < 0:
+        return None
+    return estimate
+
+
+def exact_row_count(conn, table_name):
+    cached = _row_count_cache.get(table_name)
+    if cached is not None and time.monotonic() - cached[1] < ROW_COUNT_CACHE_TTL:
+        return cached[0]
+
+    count = conn.execute(text(f'SELECT COUNT(*) FROM "{table_name}"')).scalar()
+    _row_count_cache[table_name] = (count, time.monotonic())
+    return count
+
+
+def invalidate_row_count(table_name=None):
+    if table_name is None:
+        _row_count_cache.clear()
+    else:
+        _row_count_cache.pop(table_name, None)
+
+
+def get_row_count(conn, table_name):
+    if ROW_COUNT_MODE != 'exact':
+        estimate = estimate_row_count(conn, table_name)
+        if estimate is not None and (ROW_COUNT_MODE == 'estimate' or estimate >= EXACT_COUNT_THRESHOLD):
+            return estimate, True
+
+    return exact_row_count(conn, table_name), False
+
+
+def keyset_index_name(table_name, column):
+    slug = re.sub(r'\W+', '_', column.lower()).strip('_')
+    return f'idx_{table_name}_{slug}_keyset'[:63]
+
+
+def ensure_keyset_indexes(conn, table_name):
+    for column in KEYSET_INDEX_COLUMNS.get(table_name, []):
+        conn.execute(text(
+            f'CREATE INDEX IF NOT EXISTS "{keyset_index_name(table_name, column)}" ON "{table_name}" ("{column}", id)'
+        ))
+
+
+def keyset_condition(sort_by, descending, null_cursor):
+    if sort_by == 'id':
+        return 'id < :cursor_id' if descending else 'id > :cursor_id'
+
+    column = f'"{sort_by}"'
+    # PostgreSQL puts NULLs last in ascending order and first in descending order.
+    if not descending:
+        if null_cursor:
+            return f'({column} IS NULL AND id > :cursor_id)'
+        return f'(({column}, id) > (:cursor_value, :cursor_id) OR {column} IS NULL)'
+
+    if null_cursor:
+        return f'({column} IS NOT NULL OR id < :cursor_id)'
+    return f'({column}, id) < (:cursor_value, :cursor_id)'
+
+
+def fetch_keyset_page(conn, table_name, column_types, sort_by, sort_dir, per_page, cursor=None,
+                      select_sql='*', where_sql='', params=None):
+    direction = cursor['direction'] if cursor else None
+    backward = direction in ['before', 'last']
+    descending = (sort_dir == 'desc') != backward
+    order = 'DESC' if descending else 'ASC'
+
+    order_sql = f'id {order}' if sort_by == 'id' else f'"{sort_by}" {order}, id {order}'
+    params = dict(params or {}, limit=per_page + 1)
+
+    if direction in ['after', 'before']:
+        null_cursor = cursor['value'] is None
+        condition = keyset_condition(sort_by, descending, null_cursor)
+        if not null_cursor:
+            condition = condition.replace(':cursor_value', f'CAST(:cursor_value AS {column_types[sort_by]})')
+            params["cursor_value"] = cursor['value']
+        params["cursor_id"] = cursor['id']
+        where_sql += (' AND ' if where_sql else ' WHERE ') + condition
+
+    query = text(f'SELECT {select_sql} FROM "{table_name}"{where_sql} ORDER BY {order_sql} LIMIT :limit')
+    df = pd.read_sql(query, conn, params=params)
+
+    has_more = len(df) > per_page
+    df = df.iloc[:per_page]
+    if backward:
+        df = df.iloc[::-1].reset_index(drop=True)
+
+    if direction == 'after':
+        has_prev, has_next = True, has_more
+    elif direction == 'before':
+        has_prev, has_next = has_more, True
+    elif direction == 'last':
+        has_prev, has_next = has_more, False
+    else:
+        has_prev, has_next = False, has_more
+
+    return df, has_prev, has_next
+
+
+def row_cursor(df, position, sort_by):
+    row = df.iloc[position]
+    value = row[sort_by]
+    return {
+        'value': None if pd.isna(value) else str(value),
+        'id': int(row['id']),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Create the (column, id) indexes used by keyset pagination')
+    parser.add_argument('--tables', nargs='+', default=list(KEYSET_INDEX_COLUMNS))
+    args = parser.parse_args(argv)
+
+    with get_engine().begin() as conn:
+        for table_name in args.tables:
+            ensure_keyset_indexes(conn, table_name)
+            print(f"Keyset indexes ready for {table_name}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,167 @@
+import os
+import atexit
+import threading
+import multiprocessing
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from sql_aggregates import STAT_NAMES
+import quantile_sketch
+from quantile_sketch import sketch_mode, sketch_statistics
+
+# 1 keeps statistics in-process; the pool shares the host with the Flask workers, so it is opt-in.
+PARALLEL_STATS_WORKERS = int(os.environ.get('PARALLEL_STATS_WORKERS', 1))
+# Below this many values the process hand-off costs more than it saves.
+PARALLEL_STATS_MIN_VALUES = int(os.environ.get('PARALLEL_STATS_MIN_VALUES', 2000000))
+
+_executors = {}
+_lock = threading.Lock()
+
+
+def frame_statistics(df):
+    stats = pd.DataFrame({
+        "Average": df.mean(numeric_only=True),
+        "Min": df.min(numeric_only=True),
+        "Max": df.max(numeric_only=True),
+        "Standard Deviation": df.std(numeric_only=True)
+    })
+    if sketch_mode():
+        numeric_df = df.select_dtypes('number')
+        return stats.join(pd.DataFrame({col: sketch_statistics(numeric_df[col]) for col in numeric_df}).T)
+
+    stats["Median"] = df.median(numeric_only=True)
+    return stats
+
+
+def date_statistics(values_df):
+    aggfunc = ['mean', 'min', 'max', 'std'] + ([] if sketch_mode() else ['median'])
+    pivot = values_df.pivot_table(values='value', index='date', aggfunc=aggfunc)
+    pivot.columns = STAT_NAMES[:len(aggfunc)]
+
+    if sketch_mode():
+        quantiles = pd.DataFrame({day: sketch_statistics(group) for day, group in values_df.groupby('date')['value']})
+        pivot = pivot.join(quantiles.T)
+
+    return pivot.reset_index()
+
+
+def get_executor(workers):
+    with _lock:
+        executor = _executors.get(workers)
+        if executor is None:
+            # spawn, not fork: the Flask worker may hold threads and open database connections.
+            executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            _executors[workers] = executor
+        return executor
+
+
+def shutdown_executors():
+    with _lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+atexit.register(shutdown_executors)
+
+
+def share_block(values):
+    shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+    np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf)[...] = values
+    return shm, (shm.name, values.shape, values.dtype.str)
+
+
+def attach_block(block_ref):
+    name, shape, dtype = block_ref
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def column_statistics_task(block_ref, columns, quantiles):
+    # Runs in a worker process. Blocks hold one column per row, so each column is read contiguously
+    # and in place from shared memory.
+    quantile_sketch.STATS_QUANTILES = quantiles
+    shm, block = attach_block(block_ref)
+    try:
+        stats = frame_statistics(pd.DataFrame(block.T, columns=columns, copy=False))
+        del block
+    finally:
+        shm.close()
+    return stats
+
+
+def date_statistics_task(block_ref, labels, quantiles):
+    quantile_sketch.STATS_QUANTILES = quantiles
+    shm, block = attach_block(block_ref)
+    try:
+        values_df = pd.DataFrame({'date': np.asarray(labels, dtype=object)[block[0].astype('int64')],
+                                  'value': block[1].copy()})
+        del block
+    finally:
+        shm.close()
+    return date_statistics(values_df)
+
+
+def block_dtype(dtype):
+    # float32 columns stay float32, so workers reduce in the same precision as the in-process path.
+    return 'float32' if dtype == np.dtype('float32') else 'float64'
+
+
+def run_partitions(task, partitions, workers):
+    # Each partition is (block, argument); blocks are copied into shared memory once and unlinked afterwards.
+    executor = get_executor(workers)
+    shared = []
+    try:
+        futures = []
+        for block, argument in partitions:
+            shm, block_ref = share_block(block)
+            shared.append(shm)
+            futures.append(executor.submit(task, block_ref, argument, quantile_sketch.STATS_QUANTILES))
+        return [future.result() for future in futures]
+    finally:
+        for shm in shared:
+            shm.close()
+            shm.unlink()
+
+
+def parallel_frame_statistics(df, workers=None):
+    numeric_df = df.select_dtypes(include=['number', 'bool'])
+    workers = min(workers or PARALLEL_STATS_WORKERS, len(numeric_df.columns))
+    if workers < 2 or numeric_df.size < PARALLEL_STATS_MIN_VALUES:
+        return frame_statistics(df)
+
+    # Whole columns go to each worker (for daily totals a column is one date), so every statistic,
+    # the median included, is computed over all of a column's values and the partial frames only need
+    # to be stacked. Columns are grouped by block dtype first, so a float32 column is never upcast just
+    # because it shares a block with a float64 one.
+    groups = {}
+    for col in numeric_df.columns:
+        groups.setdefault(block_dtype(numeric_df[col].dtype), []).append(col)
+
+    partitions = []
+    for dtype, group in groups.items():
+        for positions in np.array_split(np.arange(len(group)), min(workers, len(group))):
+            columns = [group[i] for i in positions]
+            block = numeric_df[columns].to_numpy(dtype=dtype, na_value=np.nan)
+            partitions.append((np.ascontiguousarray(block.T), columns))
+
+    return pd.concat(run_partitions(column_statistics_task, partitions, workers)).reindex(numeric_df.columns)
+
+
+def parallel_date_statistics(values_df, workers=None):
+    codes, labels = pd.factorize(values_df['date'], sort=True)
+    workers = min(workers or PARALLEL_STATS_WORKERS, len(labels))
+    if workers < 2 or len(values_df) < PARALLEL_STATS_MIN_VALUES:
+        return date_statistics(values_df)
+
+    # Dates are split into contiguous chunks, so each date's values are all in one worker.
+    values = values_df['value'].to_numpy(dtype=block_dtype(values_df['value'].dtype), na_value=np.nan)
+    partitions = []
+    for chunk in np.array_split(np.arange(len(labels)), workers):
+        mask = (codes >= chunk[0]) & (codes <= chunk[-1])
+        partitions.append((np.vstack([codes[mask] - chunk[0], values[mask]]).astype(values.dtype),
+                           list(labels[chunk])))
+
+    return pd.concat(run_partitions(date_statistics_task, partitions, workers), ignore_index=True)
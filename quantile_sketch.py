@@ -0,0 +1,73 @@
+import os
+import numpy as np
+
+STATS_QUANTILES = os.environ.get('STATS_QUANTILES', 'exact')
+QUANTILE_SKETCH_SIZE = int(os.environ.get('QUANTILE_SKETCH_SIZE', 200))
+
+# Reported next to the median when STATS_QUANTILES=sketch.
+SKETCH_PERCENTILES = [0.9, 0.95, 0.99]
+
+
+def sketch_mode():
+    return STATS_QUANTILES == 'sketch'
+
+
+def quantile_levels():
+    return [0.5] + (SKETCH_PERCENTILES if sketch_mode() else [])
+
+
+def quantile_names():
+    return ['Median'] + [f'P{round(level * 100)}' for level in quantile_levels()[1:]]
+
+
+def compress(values, counts, size=None):
+    size = size or QUANTILE_SKETCH_SIZE
+    if len(values) <= size:
+        return values, counts
+
+    # t-digest style merge: centroids are grouped by the arcsine scale of their rank, which keeps
+    # them small near the tails (for P99) and at most `size` of them overall.
+    total = counts.sum()
+    ranks = (np.cumsum(counts) - counts / 2) / total
+    groups = np.minimum(np.floor(size * (np.arcsin(2 * ranks - 1) / np.pi + 0.5)), size - 1)
+    starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+
+    weights = np.add.reduceat(counts, starts)
+    means = np.add.reduceat(values * counts, starts) / weights
+    return means, weights
+
+
+def build_sketch(values, size=None):
+    values = np.asarray(values, dtype='float64')
+    values = np.sort(values[~np.isnan(values)])
+    return compress(values, np.ones(len(values), dtype='int64'), size)
+
+
+def merge_sketches(sketches, size=None):
+    sketches = list(sketches)
+    if not sketches:
+        return np.empty(0), np.empty(0, dtype='int64')
+
+    values = np.concatenate([np.asarray(sketch[0], dtype='float64') for sketch in sketches])
+    counts = np.concatenate([np.asarray(sketch[1], dtype='int64') for sketch in sketches])
+    order = np.argsort(values, kind='stable')
+    return compress(values[order], counts[order], size)
+
+
+def sketch_quantiles(values, counts, levels):
+    values, counts = np.asarray(values, dtype='float64'), np.asarray(counts, dtype='int64')
+    if not len(values):
+        return [float('nan')] * len(levels)
+
+    order = np.argsort(values, kind='stable')
+    values, counts = values[order], counts[order]
+
+    # Each centroid sits at the middle rank it covers. With single values this is the same
+    # interpolation as percentile_cont and pandas' median.
+    centers = np.cumsum(counts) - counts / 2 - 0.5
+    positions = np.asarray(levels, dtype='float64') * (counts.sum() - 1)
+    return np.interp(positions, centers, values).tolist()
+
+
+def sketch_statistics(values):
+    return dict(zip(quantile_names(), sketch_quantiles(*build_sketch(values), quantile_levels())))
@@ -0,0 +1,229 @@
+import os
+import sys
+import math
+import argparse
+import datetime
+import pandas as pd
+from sqlalchemy import text
+from db import get_engine
+from sql_aggregates import STAT_NAMES, NUMERIC_TYPES
+from schema_cache import get_column_types
+from quantile_sketch import sketch_mode, sketch_quantiles, quantile_levels, quantile_names
+from stream_stats import batch_moments, merge_counts
+from table_schemas import TABLE_SCHEMAS
+
+ROLLUP_TABLE = 'daily_rollups'
+ROLLUP_STATE_TABLE = 'daily_rollup_state'
+
+STATS_ROLLUPS = os.environ.get('STATS_ROLLUPS', 'on')
+ROLLUP_BATCH_DAYS = 31
+
+# Raw tables with one date/timestamp column that rollups are kept for.
+ROLLUP_SOURCES = {table_name: {'date_column': schema['date_column']}
+                  for table_name, schema in TABLE_SCHEMAS.items() if schema['date_column']}
+
+INSERT_QUERY = f"""
+    INSERT INTO {ROLLUP_TABLE} (table_name, day, column_name, n, mean, m2, min, max, sketch_values, sketch_counts)
+    VALUES (:table_name, :day, :column_name, :n, :mean, :m2, :min, :max, :sketch_values, :sketch_counts)
+"""
+
+
+def rollups_enabled():
+    return STATS_ROLLUPS == 'on'
+
+
+def ensure_rollup_tables(conn):
+    conn.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS {ROLLUP_TABLE} (
+            table_name text NOT NULL,
+            day date NOT NULL,
+            column_name text NOT NULL,
+            n bigint NOT NULL,
+            mean double precision,
+            m2 double precision,
+            min double precision,
+            max double precision,
+            sketch_values double precision[] NOT NULL,
+            sketch_counts integer[] NOT NULL,
+            PRIMARY KEY (table_name, day, column_name)
+        )
+    """))
+    conn.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS {ROLLUP_STATE_TABLE} (
+            table_name text PRIMARY KEY,
+            built_at timestamp NOT NULL DEFAULT now()
+        )
+    """))
+
+
+def rollups_built(conn, table_name):
+    exists = conn.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": ROLLUP_STATE_TABLE}).scalar()
+    if not exists:
+        return False
+    return conn.execute(text(f'SELECT 1 FROM {ROLLUP_STATE_TABLE} WHERE table_name = :table_name'),
+                        {"table_name": table_name}).scalar() is not None
+
+
+def mark_rollups_stale(conn, table_name):
+    ensure_rollup_tables(conn)
+    conn.execute(text(f'DELETE FROM {ROLLUP_STATE_TABLE} WHERE table_name = :table_name'),
+                 {"table_name": table_name})
+
+
+def get_value_columns(conn, table_name):
+    source = ROLLUP_SOURCES[table_name]
+    return [col for col, data_type in get_column_types(conn, table_name).items()
+            if data_type in NUMERIC_TYPES and col not in ['id', source['date_column']]]
+
+
+def compute_rollup_rows(conn, table_name, days):
+    date_column = ROLLUP_SOURCES[table_name]['date_column']
+    value_columns = get_value_columns(conn, table_name)
+    if not value_columns or not days:
+        return []
+
+    select_columns = [date_column] + value_columns
+    columns_str = ', '.join([f'"{col}"' for col in select_columns])
+    query = text(f'SELECT {columns_str} FROM "{table_name}" '
+                 f'WHERE "{date_column}" >= :range_start AND "{date_column}" < :range_end')
+    df = pd.read_sql(query, conn, params={"range_start": min(days),
+                                          "range_end": max(days) + datetime.timedelta(days=1)})
+    if df.empty:
+        return []
+
+    df['day'] = pd.to_datetime(df.pop(date_column)).dt.date
+    df = df[df['day'].isin(set(days))]
+
+    # One row per day and column: statistics are read across all particles, so keeping them apart would
+    # only make the rollup larger than the HIRST tables it summarises.
+    long_df = df.melt(id_vars=['day'], value_vars=value_columns, var_name='column_name')
+    long_df['value'] = pd.to_numeric(long_df['value'], errors='coerce')
+    long_df = long_df.dropna(subset=['value'])
+
+    rows = []
+    for (day, column_name), values in long_df.groupby(['day', 'column_name'])['value']:
+        moments = batch_moments(values.to_numpy(dtype='float64'))
+        sketch_values, sketch_counts = moments['sketch']
+        rows.append({
+            'table_name': table_name,
+            'day': day,
+            'column_name': column_name,
+            'n': moments['count'],
+            'mean': moments['mean'],
+            'm2': moments['m2'],
+            'min': moments['min'],
+            'max': moments['max'],
+            'sketch_values': sketch_values.tolist(),
+            'sketch_counts': sketch_counts.tolist(),
+        })
+    return rows
+
+
+def refresh_days(conn, table_name, days):
+    days = sorted(set(days))
+    written = 0
+    for start in range(0, len(days), ROLLUP_BATCH_DAYS):
+        batch = days[start:start + ROLLUP_BATCH_DAYS]
+        rows = compute_rollup_rows(conn, table_name, batch)
+        conn.execute(text(f'DELETE FROM {ROLLUP_TABLE} WHERE table_name = :table_name AND day = ANY(:days)'),
+                     {"table_name": table_name, "days": batch})
+        if rows:
+            conn.execute(text(INSERT_QUERY), rows)
+        written += len(rows)
+    return written
+
+
+def touched_days(conn, staging_name, table_name):
+    date_column = ROLLUP_SOURCES[table_name]['date_column']
+    rows = conn.execute(text(f'SELECT DISTINCT CAST("{date_column}" AS date) FROM "{staging_name}" '
+                             f'WHERE "{date_column}" IS NOT NULL'))
+    return [row[0] for row in rows]
+
+
+def update_rollups_for_upload(conn, table_name, staging_name):
+    if table_name not in ROLLUP_SOURCES or not rollups_built(conn, table_name):
+        return None
+    days = touched_days(conn, staging_name, table_name)
+    written = refresh_days(conn, table_name, days)
+    print(f"  - refreshed rollups for {len(days)} day(s) ({written} rows)")
+    return len(days)
+
+
+def rebuild_rollups(table_name, engine=None):
+    engine = engine or get_engine()
+    date_column = ROLLUP_SOURCES[table_name]['date_column']
+
+    with engine.begin() as conn:
+        ensure_rollup_tables(conn)
+        mark_rollups_stale(conn, table_name)
+        conn.execute(text(f'DELETE FROM {ROLLUP_TABLE} WHERE table_name = :table_name'), {"table_name": table_name})
+        days = [row[0] for row in conn.execute(text(
+            f'SELECT DISTINCT CAST("{date_column}" AS date) FROM "{table_name}" WHERE "{date_column}" IS NOT NULL'
+        ))]
+        written = refresh_days(conn, table_name, days)
+        conn.execute(text(f'INSERT INTO {ROLLUP_STATE_TABLE} (table_name) VALUES (:table_name)'),
+                     {"table_name": table_name})
+
+    print(f"Rebuilt rollups for {table_name}: {len(days)} days, {written} rows")
+    return written
+
+
+def read_rollup_statistics(conn, table_name, columns, bounds):
+    if table_name not in ROLLUP_SOURCES or not columns or not rollups_built(conn, table_name):
+        return None
+
+    params = {"table_name": table_name, "range_start": bounds[0], "range_end": bounds[1], "columns": list(columns)}
+    where_sql = """
+        WHERE table_name = :table_name AND day >= :range_start AND day <= :range_end
+        AND column_name = ANY(:columns)
+    """
+
+    # Each day's mean and sum of squared deviations are merged pairwise, as the streaming statistics do,
+    # rather than from a running sum of squares that loses precision to cancellation.
+    moments = {}
+    lossless = True
+    for column_name, n, mean, m2, min_value, max_value, exact_sketch in conn.execute(text(f"""
+        SELECT column_name, n, mean, m2, min, max, cardinality(sketch_values) = n FROM {ROLLUP_TABLE}{where_sql}
+    """), params):
+        day = {'count': n, 'mean': mean, 'm2': m2, 'min': min_value, 'max': max_value}
+        moments[column_name] = merge_counts(moments[column_name], day) if column_name in moments else day
+        lossless = lossless and exact_sketch
+
+    # A day's sketch holds every value unless the day had more than QUANTILE_SKETCH_SIZE of them. Exact mode
+    # can only be answered from the rollups when no day in range was compressed; otherwise the raw table
+    # is aggregated instead.
+    if not lossless and not sketch_mode():
+        return None
+
+    stats = pd.DataFrame(index=list(columns), columns=STAT_NAMES, dtype='float64')
+    for column_name, merged in moments.items():
+        n = merged['count']
+        std = math.sqrt(merged['m2'] / (n - 1)) if n > 1 else float('nan')
+        stats.loc[column_name, STAT_NAMES[:4]] = [merged['mean'], merged['min'], merged['max'], std]
+
+    # Flatten every day's sketch into one value/count array per column for the quantile merge.
+    for column_name, sketch_values, sketch_counts in conn.execute(text(f"""
+        SELECT column_name, array_agg(point.value), array_agg(point.count)
+        FROM {ROLLUP_TABLE} CROSS JOIN LATERAL unnest(sketch_values, sketch_counts) AS point(value, count)
+        {where_sql}
+        GROUP BY column_name
+    """), params):
+        stats.loc[column_name, quantile_names()] = sketch_quantiles(sketch_values, sketch_counts, quantile_levels())
+
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build the per-day statistics rollups')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    rebuild_parser = subparsers.add_parser('rebuild', help='recompute rollups from the raw tables')
+    rebuild_parser.add_argument('--tables', nargs='+', choices=list(ROLLUP_SOURCES), default=list(ROLLUP_SOURCES))
+    args = parser.parse_args(argv)
+
+    if args.command == 'rebuild':
+        for table_name in args.tables:
+            rebuild_rollups(table_name)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,103 @@
+import os
+import time
+import threading
+from sqlalchemy import text
+from header_classifier import header_date
+
+SCHEMA_CACHE_TTL = float(os.environ.get('SCHEMA_CACHE_TTL', 60))
+
+# Tables the app keeps for itself (ingest jobs, table versions, rollups and the long daily-totals storage,
+# which is browsed through hirst_daily_particle_totals); they are not listed on the index page.
+INTERNAL_TABLES = ['ingest_jobs', 'table_versions', 'daily_rollups', 'daily_rollup_state',
+                   'hirst_daily_particle_values']
+
+_cache = {}
+_lock = threading.Lock()
+_counters = {'hits': 0, 'misses': 0, 'invalidations': 0}
+_table_versions = {}
+
+
+def cached(key, loader):
+    now = time.monotonic()
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None and entry[1] > now:
+            _counters['hits'] += 1
+            return entry[0]
+        _counters['misses'] += 1
+
+    value = loader()
+    with _lock:
+        _cache[key] = (value, now + SCHEMA_CACHE_TTL)
+    return value
+
+
+def get_tables(conn):
+    def load():
+        rows = conn.execute(text("""
+            SELECT table_name FROM information_schema.tables
+            WHERE table_schema = 'public' AND table_name <> ALL(:internal_tables)
+        """), {"internal_tables": INTERNAL_TABLES})
+        return [row[0] for row in rows]
+
+    return list(cached(('tables',), load))
+
+
+def get_column_types(conn, table_name):
+    def load():
+        rows = conn.execute(text("""
+            SELECT column_name, data_type
+            FROM information_schema.columns
+            WHERE table_name = :table_name
+            AND table_schema = 'public'
+            ORDER BY ordinal_position
+        """), {"table_name": table_name})
+        return {row[0]: row[1] for row in rows}
+
+    return dict(cached(('columns', table_name), load))
+
+
+def get_columns(conn, table_name):
+    return list(get_column_types(conn, table_name))
+
+
+def get_date_columns(conn, table_name):
+    def load():
+        date_columns = {}
+        for col in get_column_types(conn, table_name):
+            day = header_date(col)
+            if day is not None:
+                date_columns[col] = day
+        return date_columns
+
+    return dict(cached(('date_columns', table_name), load))
+
+
+def invalidate(table_name=None):
+    with _lock:
+        _counters['invalidations'] += 1
+        if table_name is None:
+            _cache.clear()
+            return
+        for key in [('tables',), ('columns', table_name), ('date_columns', table_name)]:
+            _cache.pop(key, None)
+
+
+def observe_version(table_name, version):
+    # Uploads usually run in another process, so their invalidate() never reaches this cache. A data
+    # version this process has not seen yet means the table's columns may have changed as well.
+    with _lock:
+        changed = _table_versions.get(table_name) != version
+        _table_versions[table_name] = version
+    if changed:
+        invalidate(table_name)
+
+
+def get_cache_stats():
+    with _lock:
+        stats = dict(_counters)
+        stats['entries'] = len(_cache)
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_ratio'] = round(stats['hits'] / lookups, 3) if lookups else None
+    stats['ttl_seconds'] = SCHEMA_CACHE_TTL
+    return stats
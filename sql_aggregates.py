@@ -0,0 +1,93 @@
+import pandas as pd
+from sqlalchemy import text
+from quantile_sketch import quantile_levels, quantile_names
+
+STAT_NAMES = ['Average', 'Min', 'Max', 'Standard Deviation'] + quantile_names()
+
+NUMERIC_TYPES = ('smallint', 'integer', 'bigint', 'real', 'double precision', 'numeric')
+
+TOTAL_EXPRESSION = "coalesce(upper(trim(particle::text)) = 'TOTAL', false)"
+
+
+def quantile_expressions(value):
+    levels = quantile_levels()
+    if len(levels) == 1:
+        return [f'percentile_cont({levels[0]}) WITHIN GROUP (ORDER BY {value})']
+
+    # PostgreSQL evaluates identical aggregate calls once, so every percentile shares a single sort.
+    quantiles = f'percentile_cont(ARRAY{levels}) WITHIN GROUP (ORDER BY {value})'
+    return [f'({quantiles})[{i + 1}]' for i in range(len(levels))]
+
+
+def aggregate_expressions(expression):
+    value = f'({expression})::double precision'
+    expressions = [
+        f'avg({value})',
+        f'min({value})',
+        f'max({value})',
+        f'stddev_samp({value})',
+    ]
+    return expressions + quantile_expressions(value)
+
+
+def column_statistics(conn, table_name, columns, where_sql='', params=None, group_expression=None):
+    select_parts = []
+    if group_expression:
+        select_parts.append(f'{group_expression} AS grp')
+
+    for i, col in enumerate(columns):
+        for j, expression in enumerate(aggregate_expressions(f'"{col}"')):
+            select_parts.append(f'{expression} AS s{i}_{j}')
+
+    query = f'SELECT {", ".join(select_parts)} FROM "{table_name}" {where_sql}'
+    if group_expression:
+        query += f' GROUP BY {group_expression}'
+
+    rows = conn.execute(text(query), params or {}).fetchall()
+
+    result = {}
+    for row in rows:
+        values = row[1:] if group_expression else row
+        stats = pd.DataFrame(
+            [[values[i * len(STAT_NAMES) + j] for j in range(len(STAT_NAMES))] for i in range(len(columns))],
+            index=columns,
+            columns=STAT_NAMES,
+            dtype='float64'
+        )
+        result[row[0] if group_expression else None] = stats
+
+    return result
+
+
+def unpivoted_statistics(conn, table_name, value_columns, where_sql='', params=None, group_expression='true'):
+    values_list = ', '.join([f"('{label}', \"{col}\"::double precision)" for col, label in value_columns.items()])
+    aggregates = ', '.join([f'{expression} AS "{name}"'
+                            for expression, name in zip(aggregate_expressions('v.value'), STAT_NAMES)])
+
+    query = f"""
+        SELECT {group_expression} AS grp, v.date AS date, {aggregates}
+        FROM "{table_name}"
+        CROSS JOIN LATERAL (VALUES {values_list}) AS v(date, value)
+        {where_sql}
+        GROUP BY GROUPING SETS (({group_expression}, v.date), ({group_expression}))
+        ORDER BY grp, v.date
+    """
+
+    return pd.DataFrame(conn.execute(text(query), params or {}).fetchall(),
+                        columns=['grp', 'date'] + STAT_NAMES)
+
+
+def long_statistics(conn, table_name, where_sql='', params=None, group_expression='true'):
+    aggregates = ', '.join([f'{expression} AS "{name}"'
+                            for expression, name in zip(aggregate_expressions('value'), STAT_NAMES)])
+
+    query = f"""
+        SELECT {group_expression} AS grp, date, {aggregates}
+        FROM "{table_name}"
+        {where_sql}
+        GROUP BY GROUPING SETS (({group_expression}, date), ({group_expression}))
+        ORDER BY grp, date
+    """
+
+    return pd.DataFrame(conn.execute(text(query), params or {}).fetchall(),
+                        columns=['grp', 'date'] + STAT_NAMES)
@@ -1,9 +1,81 @@
+import os
 import pandas as pd
-import numpy as np
 from sqlalchemy import text
 from db import get_engine
+from sql_aggregates import STAT_NAMES, NUMERIC_TYPES, TOTAL_EXPRESSION, column_statistics, unpivoted_statistics, \
+    long_statistics
+from daily_totals_store import LONG_TABLE, melt_date_columns, use_long_storage, \
+    build_long_filter, read_daily_totals_wide, get_long_stations
+from header_classifier import header_date
+from schema_cache import get_column_types, observe_version
+from rollups import rollups_enabled, read_rollup_statistics
+from stats_cache import get_table_version, make_key, get_or_compute
+from quantile_sketch import STATS_QUANTILES, sketch_mode, sketch_statistics
+from frame_reader import read_typed_frame
+from stream_stats import streaming_enabled, iter_value_batches, stream_statistics
+from parallel_stats import parallel_frame_statistics, parallel_date_statistics
+from table_schemas import TABLE_SCHEMAS
 import datetime
 
+STATS_ENGINE = os.environ.get('STATS_ENGINE', 'sql')
+
+DATE_COLUMN_MAPPING = {table_name: schema['date_column'] for table_name, schema in TABLE_SCHEMAS.items()}
+
+STATION_TABLES = ['hirst_daily_particle_totals']
+
+
+STATS_EXCLUDED_COLUMNS = ['id', 'station', 'particle', 'date', 'pollenfactor', 'sporesfactor']
+
+
+def get_table_column_types(conn, table_name):
+    return get_column_types(conn, table_name)
+
+
+def get_table_columns(conn, table_name):
+    return list(get_table_column_types(conn, table_name))
+
+
+def get_date_bounds(selected_date=None, start_date=None, end_date=None):
+    if selected_date:
+        day = pd.to_datetime(selected_date).date()
+        return day, day
+    if start_date and end_date:
+        return pd.to_datetime(start_date).date(), pd.to_datetime(end_date).date()
+    return None
+
+
+def build_filter_clause(table_name, selected_date=None, selected_station=None, start_date=None, end_date=None):
+    conditions = []
+    params = {}
+
+    date_column = DATE_COLUMN_MAPPING.get(table_name)
+    bounds = get_date_bounds(selected_date, start_date, end_date)
+    if date_column and bounds:
+        # Half-open range so the predicate stays index-friendly for both date and timestamp columns.
+        conditions.append(f'"{date_column}" >= :range_start AND "{date_column}" < :range_end')
+        params["range_start"] = bounds[0]
+        params["range_end"] = bounds[1] + datetime.timedelta(days=1)
+
+    if selected_station and table_name in STATION_TABLES:
+        conditions.append('station = :station')
+        params["station"] = selected_station
+
+    where_sql = ' WHERE ' + ' AND '.join(conditions) if conditions else ''
+    return where_sql, params
+
+
+def build_fetch_query(table_name, columns=None, selected_date=None, selected_station=None,
+                      start_date=None, end_date=None, limit=None):
+    where_sql, params = build_filter_clause(table_name, selected_date, selected_station, start_date, end_date)
+
+    columns_str = ', '.join([f'"{col}"' for col in columns]) if columns else '*'
+    query = f'SELECT {columns_str} FROM "{table_name}"{where_sql}'
+    if limit is not None:
+        query += ' LIMIT :limit'
+        params["limit"] = limit
+
+    return text(query), params
+
 
 def identify_date_layout(df):
     if 'time' in df.columns:
@@ -27,25 +99,57 @@ def compute_statistics(df, include_totals=False):
             total_mask = df['particle'].astype(str).str.strip().str.upper() == 'TOTAL'
             df = df[total_mask]
 
-    return pd.DataFrame({
-        "Average": df.mean(numeric_only=True),
-        "Min": df.min(numeric_only=True),
-        "Max": df.max(numeric_only=True),
-        "Standard Deviation": df.std(numeric_only=True),
-        "Median": df.median(numeric_only=True)
-    })
+    return parallel_frame_statistics(df)
+
+
+def value_quantiles(values):
+    if sketch_mode():
+        return sketch_statistics(values)
+    return {'Median': values.median()}
+
+
+def pivot_statistics(values_df):
+    return parallel_date_statistics(values_df)
+
+
+def overall_statistics(values, label):
+    row = {
+        'date': label,
+        'Average': values.mean(),
+        'Min': values.min(),
+        'Max': values.max(),
+        'Standard Deviation': values.std()
+    }
+    row.update(value_quantiles(values))
+    return pd.DataFrame([row])
 
 
 def fetch_data(table_name, selected_date=None, selected_station=None, start_date=None, end_date=None):
 
     engine = get_engine()
+    date_filtered_in_sql = DATE_COLUMN_MAPPING.get(table_name) is not None
+
+    bounds = get_date_bounds(selected_date, start_date, end_date)
+    empty_stats = pd.DataFrame(columns=STAT_NAMES)
 
     with engine.connect() as conn:
-        if table_name == "hirst_daily_particle_totals" and selected_station:
-            query = text(f'SELECT * FROM "{table_name}" WHERE station = :station')
-            df = pd.read_sql(query, conn, params={"station": selected_station})
+        if table_name == "hirst_daily_particle_totals" and use_long_storage():
+            df = read_daily_totals_wide(conn, selected_station, bounds)
+            if df.empty and bounds:
+                return pd.DataFrame(), {'regular': empty_stats, 'total': empty_stats}
         else:
-            df = pd.read_sql(text(f'SELECT * FROM "{table_name}"'), conn)
+            columns = None
+            if table_name == "hirst_daily_particle_totals" and bounds:
+                all_columns = get_table_columns(conn, table_name)
+                window_columns = [col for col in all_columns
+                                  if header_date(col) and bounds[0] <= header_date(col) <= bounds[1]]
+                if not window_columns:
+                    return pd.DataFrame(), {'regular': empty_stats, 'total': empty_stats}
+                columns = [col for col in all_columns if not header_date(col)] + window_columns
+
+            query, params = build_fetch_query(table_name, columns, selected_date, selected_station,
+                                              start_date, end_date)
+            df = read_typed_frame(conn, query, table_name, params)
 
     if df.empty:
         return pd.DataFrame(), pd.DataFrame()
@@ -56,11 +160,11 @@ def fetch_data(table_name, selected_date=None, selected_station=None, start_date
     if layout in ['time', 'LTKLAI', 'LTSIAU', 'LTVILN']:
         df[layout] = pd.to_datetime(df[layout], errors='coerce')
 
-        if selected_date:
+        if selected_date and not date_filtered_in_sql:
             selected_date = pd.to_datetime(selected_date).date()
             df = df[df[layout].dt.date == selected_date]
 
-        elif start_date and end_date:
+        elif start_date and end_date and not date_filtered_in_sql:
             start_date_obj = pd.to_datetime(start_date).date()
             end_date_obj = pd.to_datetime(end_date).date()
 
@@ -73,11 +177,12 @@ def fetch_data(table_name, selected_date=None, selected_station=None, start_date
             df.insert(0, 'date', date_col)
 
     elif layout == 'columns':
-        date_columns = [col for col in df.columns if col.startswith('2024-')]
+        date_columns = [col for col in df.columns if header_date(col)]
         non_date_columns = [col for col in df.columns if col not in date_columns]
 
         if selected_date:
-            matching_columns = [col for col in date_columns if selected_date in col]
+            selected_day = pd.to_datetime(selected_date).date()
+            matching_columns = [col for col in date_columns if header_date(col) == selected_day]
             if not matching_columns:
                 df = pd.DataFrame()
             else:
@@ -88,34 +193,14 @@ def fetch_data(table_name, selected_date=None, selected_station=None, start_date
             start_date_obj = pd.to_datetime(start_date)
             end_date_obj = pd.to_datetime(end_date)
 
-            matching_columns = []
-            date_mapping = {}
-
-            for col in date_columns:
-                try:
-                    date_part = col.split(' ')[0]
-                    col_date = pd.to_datetime(date_part)
-                    if start_date_obj <= col_date <= end_date_obj:
-                        matching_columns.append(col)
-                        date_mapping[col] = col_date.strftime('%Y-%m-%d')
-                except:
-                    continue
+            matching_columns = [col for col in date_columns
+                                if start_date_obj.date() <= header_date(col) <= end_date_obj.date()]
 
             if matching_columns:
                 selected_cols = non_date_columns + matching_columns
                 df = df[selected_cols]
 
-                stats_by_date = pd.DataFrame()
-
-                for index, row in df.iterrows():
-                    row_data = {col: row[col] for col in non_date_columns}
-
-                    for date_col in matching_columns:
-                        new_row = row_data.copy()
-                        new_row['date'] = date_mapping[date_col]
-                        new_row['value'] = row[date_col]
-
-                        stats_by_date = pd.concat([stats_by_date, pd.DataFrame([new_row])], ignore_index=True)
+                stats_by_date = melt_date_columns(df, matching_columns)
 
                 display_df = df.copy()
 
@@ -130,106 +215,47 @@ def fetch_data(table_name, selected_date=None, selected_station=None, start_date
                     total_mask = stats_df['particle'].astype(str).str.strip().str.upper() == 'TOTAL'
                     stats_total = stats_df[total_mask]
 
-                    expected_columns = ['date', 'Average', 'Min', 'Max', 'Standard Deviation', 'Median']
+                    expected_columns = ['date'] + STAT_NAMES
 
                     if not stats_regular.empty:
                         try:
-                            pivot_regular = stats_regular.pivot_table(
-                                values='value',
-                                index='date',
-                                aggfunc=['mean', 'min', 'max', 'std', 'median']
-                            )
-
-                            pivot_regular.columns = ['Average', 'Min', 'Max', 'Standard Deviation', 'Median']
-                            pivot_regular = pivot_regular.reset_index()
-
-                            overall_regular = pd.DataFrame([{
-                                'date': f'Overall Regular ({start_date} to {end_date})',
-                                'Average': stats_regular['value'].mean(),
-                                'Min': stats_regular['value'].min(),
-                                'Max': stats_regular['value'].max(),
-                                'Standard Deviation': stats_regular['value'].std(),
-                                'Median': stats_regular['value'].median()
-                            }])
+                            pivot_regular = pivot_statistics(stats_regular)
+
+                            overall_regular = overall_statistics(stats_regular['value'],
+                                                                 f'Overall Regular ({start_date} to {end_date})')
 
                             result['regular'] = pd.concat([pivot_regular, overall_regular], ignore_index=True)
                         except Exception as e:
-                            result['regular'] = pd.DataFrame([{
-                                'date': f'Overall Regular ({start_date} to {end_date})',
-                                'Average': stats_regular['value'].mean(),
-                                'Min': stats_regular['value'].min(),
-                                'Max': stats_regular['value'].max(),
-                                'Standard Deviation': stats_regular['value'].std(),
-                                'Median': stats_regular['value'].median()
-                            }])
+                            result['regular'] = overall_statistics(stats_regular['value'],
+                                                                   f'Overall Regular ({start_date} to {end_date})')
                     else:
                         result['regular'] = pd.DataFrame(columns=expected_columns)
 
                     if not stats_total.empty:
                         try:
-                            pivot_total = stats_total.pivot_table(
-                                values='value',
-                                index='date',
-                                aggfunc=['mean', 'min', 'max', 'std', 'median']
-                            )
-
-                            pivot_total.columns = ['Average', 'Min', 'Max', 'Standard Deviation', 'Median']
-                            pivot_total = pivot_total.reset_index()
-
-                            overall_total = pd.DataFrame([{
-                                'date': f'Overall Totals ({start_date} to {end_date})',
-                                'Average': stats_total['value'].mean(),
-                                'Min': stats_total['value'].min(),
-                                'Max': stats_total['value'].max(),
-                                'Standard Deviation': stats_total['value'].std(),
-                                'Median': stats_total['value'].median()
-                            }])
+                            pivot_total = pivot_statistics(stats_total)
+
+                            overall_total = overall_statistics(stats_total['value'],
+                                                               f'Overall Totals ({start_date} to {end_date})')
 
                             result['total'] = pd.concat([pivot_total, overall_total], ignore_index=True)
                         except Exception as e:
-                            result['total'] = pd.DataFrame([{
-                                'date': f'Overall Totals ({start_date} to {end_date})',
-                                'Average': stats_total['value'].mean(),
-                                'Min': stats_total['value'].min(),
-                                'Max': stats_total['value'].max(),
-                                'Standard Deviation': stats_total['value'].std(),
-                                'Median': stats_total['value'].median()
-                            }])
+                            result['total'] = overall_statistics(stats_total['value'],
+                                                                 f'Overall Totals ({start_date} to {end_date})')
                     else:
                         result['total'] = pd.DataFrame(columns=expected_columns)
 
                     return display_df, result
 
                 try:
-                    stats_df = stats_df.pivot_table(
-                        values='value',
-                        index='date',
-                        aggfunc=['mean', 'min', 'max', 'std', 'median']
-                    )
-
-                    stats_df.columns = ['Average', 'Min', 'Max', 'Standard Deviation', 'Median']
+                    stats_df = pivot_statistics(stats_df)
 
-                    stats_df = stats_df.reset_index()
-
-                    overall_stats = pd.DataFrame([{
-                        'date': f'Overall ({start_date} to {end_date})',
-                        'Average': stats_by_date['value'].mean(),
-                        'Min': stats_by_date['value'].min(),
-                        'Max': stats_by_date['value'].max(),
-                        'Standard Deviation': stats_by_date['value'].std(),
-                        'Median': stats_by_date['value'].median()
-                    }])
+                    overall_stats = overall_statistics(stats_by_date['value'],
+                                                       f'Overall ({start_date} to {end_date})')
 
                     stats_df = pd.concat([stats_df, overall_stats], ignore_index=True)
                 except Exception as e:
-                    stats_df = pd.DataFrame([{
-                        'date': f'Overall ({start_date} to {end_date})',
-                        'Average': stats_by_date['value'].mean() if not stats_by_date.empty else np.nan,
-                        'Min': stats_by_date['value'].min() if not stats_by_date.empty else np.nan,
-                        'Max': stats_by_date['value'].max() if not stats_by_date.empty else np.nan,
-                        'Standard Deviation': stats_by_date['value'].std() if not stats_by_date.empty else np.nan,
-                        'Median': stats_by_date['value'].median() if not stats_by_date.empty else np.nan
-                    }])
+                    stats_df = overall_statistics(stats_by_date['value'], f'Overall ({start_date} to {end_date})')
 
                 return display_df, stats_df
             else:
@@ -239,10 +265,10 @@ def fetch_data(table_name, selected_date=None, selected_station=None, start_date
 
     if df.empty:
         if has_totals:
-            empty_stats = pd.DataFrame(columns=['Average', 'Min', 'Max', 'Standard Deviation', 'Median'])
+            empty_stats = pd.DataFrame(columns=STAT_NAMES)
             return df, {'regular': empty_stats, 'total': empty_stats}
         else:
-            return df, pd.DataFrame(columns=['Average', 'Min', 'Max', 'Standard Deviation', 'Median'])
+            return df, pd.DataFrame(columns=STAT_NAMES)
 
     display_df = df.copy()
 
@@ -280,7 +306,7 @@ def fetch_data(table_name, selected_date=None, selected_station=None, start_date
 
             return display_df, {'regular': regular_stats, 'total': total_stats}
         except Exception as e:
-            empty_stats = pd.DataFrame(columns=['Average', 'Min', 'Max', 'Standard Deviation', 'Median'])
+            empty_stats = pd.DataFrame(columns=STAT_NAMES)
             return display_df, {'regular': empty_stats, 'total': empty_stats}
     else:
         try:
@@ -303,18 +329,209 @@ def fetch_data(table_name, selected_date=None, selected_station=None, start_date
 
             return display_df, stats_df
         except Exception as e:
-            return display_df, pd.DataFrame(columns=['Average', 'Min', 'Max', 'Standard Deviation', 'Median'])
+            return display_df, pd.DataFrame(columns=STAT_NAMES)
+
+
+def empty_statistics():
+    return pd.DataFrame(columns=STAT_NAMES)
+
+
+def fetch_statistics_sql(table_name, selected_date=None, selected_station=None, start_date=None, end_date=None,
+                         sample_size=10):
+    date_column = DATE_COLUMN_MAPPING.get(table_name)
+    bounds = get_date_bounds(selected_date, start_date, end_date)
+    if table_name not in DATE_COLUMN_MAPPING or not bounds:
+        return None
+
+    where_sql, params = build_filter_clause(table_name, selected_date, selected_station, start_date, end_date)
+
+    with get_engine().connect() as conn:
+        if table_name == 'hirst_daily_particle_totals' and use_long_storage():
+            return fetch_long_statistics_sql(conn, selected_date, selected_station, start_date, end_date,
+                                             sample_size)
+
+        column_types = get_table_column_types(conn, table_name)
+
+        if table_name == 'hirst_daily_particle_totals':
+            window_columns = {col: header_date(col).strftime('%Y-%m-%d') for col in column_types
+                              if header_date(col) and bounds[0] <= header_date(col) <= bounds[1]}
+            if not window_columns:
+                return pd.DataFrame(), {'regular': empty_statistics(), 'total': empty_statistics()}
+
+            sample_columns = [col for col in column_types if not header_date(col)] + list(window_columns)
+            query, sample_params = build_fetch_query(table_name, sample_columns, selected_date, selected_station,
+                                                     start_date, end_date, limit=sample_size)
+            sample_df = pd.read_sql(query, conn, params=sample_params)
+            if sample_df.empty:
+                return pd.DataFrame(), pd.DataFrame()
+
+            if selected_date:
+                grouped = column_statistics(conn, table_name, list(window_columns), where_sql, params,
+                                            group_expression=TOTAL_EXPRESSION)
+                regular_stats = grouped.get(False, pd.DataFrame())
+                total_stats = grouped.get(True, pd.DataFrame())
+
+                if regular_stats.empty and not total_stats.empty:
+                    regular_stats = pd.DataFrame(index=total_stats.index, columns=total_stats.columns)
+                elif total_stats.empty and not regular_stats.empty:
+                    total_stats = pd.DataFrame(index=regular_stats.index, columns=regular_stats.columns)
+
+                return sample_df, {'regular': regular_stats, 'total': total_stats}
+
+            by_date = unpivoted_statistics(conn, table_name, window_columns, where_sql, params,
+                                           group_expression=TOTAL_EXPRESSION)
+            result = {}
+            for key, is_total, label in [('regular', False, 'Overall Regular'), ('total', True, 'Overall Totals')]:
+                group = by_date[by_date['grp'] == is_total].drop(columns=['grp'])
+                if group.empty:
+                    result[key] = pd.DataFrame(columns=['date'] + STAT_NAMES)
+                    continue
+                group['date'] = group['date'].fillna(f'{label} ({start_date} to {end_date})')
+                result[key] = group.reset_index(drop=True)
+
+            return sample_df, result
+
+        query, sample_params = build_fetch_query(table_name, None, selected_date, selected_station,
+                                                 start_date, end_date, limit=sample_size)
+        sample_df = pd.read_sql(query, conn, params=sample_params)
+        if sample_df.empty:
+            return pd.DataFrame(), pd.DataFrame()
+
+        numeric_columns = [col for col, data_type in column_types.items()
+                           if data_type in NUMERIC_TYPES and col != date_column and
+                           col.lower().replace(' ', '') not in STATS_EXCLUDED_COLUMNS]
+        stats = None
+        if rollups_enabled():
+            stats = read_rollup_statistics(conn, table_name, numeric_columns, bounds)
+        if stats is None:
+            stats = column_statistics(conn, table_name, numeric_columns, where_sql, params)[None]
+
+    date_values = pd.to_datetime(sample_df.pop(date_column), errors='coerce')
+    sample_df.insert(0, 'date', date_values)
+
+    return sample_df, stats
+
+
+def fetch_long_statistics_sql(conn, selected_date=None, selected_station=None, start_date=None, end_date=None,
+                              sample_size=10):
+    bounds = get_date_bounds(selected_date, start_date, end_date)
+    where_sql, params = build_long_filter(selected_station, bounds)
+
+    sample_df = read_daily_totals_wide(conn, selected_station, bounds).head(sample_size)
+    if sample_df.empty:
+        return pd.DataFrame(), {'regular': empty_statistics(), 'total': empty_statistics()}
+
+    by_date = long_statistics(conn, LONG_TABLE, where_sql, params, group_expression=TOTAL_EXPRESSION)
+    by_date['date'] = by_date['date'].map(lambda value: value.strftime('%Y-%m-%d') if pd.notna(value) else None)
+
+    if selected_date:
+        result = {}
+        for key, is_total in [('regular', False), ('total', True)]:
+            group = by_date[(by_date['grp'] == is_total) & by_date['date'].notna()]
+            result[key] = group.set_index('date')[STAT_NAMES].rename_axis(None)
+
+        if result['regular'].empty and not result['total'].empty:
+            result['regular'] = pd.DataFrame(index=result['total'].index, columns=result['total'].columns)
+        elif result['total'].empty and not result['regular'].empty:
+            result['total'] = pd.DataFrame(index=result['regular'].index, columns=result['regular'].columns)
+
+        return sample_df, result
+
+    result = {}
+    for key, is_total, label in [('regular', False, 'Overall Regular'), ('total', True, 'Overall Totals')]:
+        group = by_date[by_date['grp'] == is_total].drop(columns=['grp'])
+        if group.empty:
+            result[key] = pd.DataFrame(columns=['date'] + STAT_NAMES)
+            continue
+        group['date'] = group['date'].fillna(f'{label} ({start_date} to {end_date})')
+        result[key] = group.reset_index(drop=True)
+
+    return sample_df, result
+
+
+def fetch_statistics_streaming(table_name, selected_station=None, sample_size=10):
+    date_column = DATE_COLUMN_MAPPING.get(table_name)
+
+    with get_engine().connect() as conn:
+        query, sample_params = build_fetch_query(table_name, selected_station=selected_station, limit=sample_size)
+        sample_df = pd.read_sql(query, conn, params=sample_params)
+        if sample_df.empty:
+            return pd.DataFrame(), pd.DataFrame()
+
+        column_types = get_table_column_types(conn, table_name)
+        numeric_columns = [col for col, data_type in column_types.items()
+                           if data_type in NUMERIC_TYPES and col != date_column and
+                           col.lower().replace(' ', '') not in STATS_EXCLUDED_COLUMNS]
+        has_totals = table_name == "hirst_daily_particle_totals" and 'particle' in column_types
+
+        where_sql, params = build_filter_clause(table_name, selected_station=selected_station)
+        select_parts = [f'"{col}"' for col in numeric_columns]
+        if has_totals:
+            select_parts.insert(0, f'({TOTAL_EXPRESSION})::int')
+        query = f'SELECT {", ".join(select_parts)} FROM "{table_name}"{where_sql}'
+
+        stats = stream_statistics(iter_value_batches(conn, query, params), numeric_columns,
+                                  group_names=['regular', 'total'] if has_totals else None)
+
+    if has_totals:
+        return sample_df, stats
+
+    if date_column in sample_df.columns:
+        date_values = pd.to_datetime(sample_df.pop(date_column), errors='coerce')
+        sample_df.insert(0, 'date', date_values)
+    return sample_df, stats[None]
+
+
+def fetch_statistics_pandas(table_name, selected_date=None, selected_station=None, start_date=None, end_date=None):
+    whole_table = get_date_bounds(selected_date, start_date, end_date) is None
+    if whole_table and streaming_enabled() and not (table_name == "hirst_daily_particle_totals" and use_long_storage()):
+        return fetch_statistics_streaming(table_name, selected_station)
+
+    df, stats_df = fetch_data(table_name, selected_date, selected_station, start_date, end_date)
+
+    if isinstance(stats_df, pd.DataFrame) and 'date' not in stats_df.columns and not df.empty:
+        stats_df = compute_statistics(stats_df)
+
+    return df, stats_df
+
+
+def fetch_statistics(table_name, selected_date=None, selected_station=None, start_date=None, end_date=None):
+    with get_engine().connect() as conn:
+        version = get_table_version(conn, table_name)
+    observe_version(table_name, version)
+
+    key = make_key(table_name, version, selected_station, selected_date, start_date, end_date,
+                   STATS_ENGINE, use_long_storage(), STATS_QUANTILES)
+
+    def compute():
+        df, stats_df = compute_fetch_statistics(table_name, selected_date, selected_station, start_date, end_date)
+        # The view only renders the first rows, so cache a sample rather than every fetched row.
+        return df.head(10), stats_df
+
+    return get_or_compute(key, compute)
+
+
+def compute_fetch_statistics(table_name, selected_date=None, selected_station=None, start_date=None,
+                             end_date=None):
+    if STATS_ENGINE == 'sql':
+        try:
+            result = fetch_statistics_sql(table_name, selected_date, selected_station, start_date, end_date)
+            if result is not None:
+                return result
+        except Exception as e:
+            print(f"SQL statistics failed for {table_name}, falling back to pandas: {e}")
+
+    return fetch_statistics_pandas(table_name, selected_date, selected_station, start_date, end_date)
 
 
 def get_available_stations(table_name):
     engine = get_engine()
     with engine.connect() as conn:
         try:
-            query = text(
-                f"SELECT column_name FROM information_schema.columns WHERE table_name = '{table_name}' AND column_name = 'station'")
-            result = conn.execute(query).fetchone()
+            if table_name == 'hirst_daily_particle_totals' and use_long_storage():
+                return get_long_stations(conn)
 
-            if result:
+            if 'station' in get_column_types(conn, table_name):
                 stations = pd.read_sql(text(f'SELECT DISTINCT station FROM "{table_name}"'), conn)
                 return stations['station'].tolist()
             return []
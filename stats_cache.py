@@ -0,0 +1,154 @@
+import os
+import pickle
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
+
+STATS_CACHE_SIZE = int(os.environ.get('STATS_CACHE_SIZE', 128))
+STATS_CACHE_DIR = os.environ.get('STATS_CACHE_DIR', '')
+STATS_CACHE_DISK_MB = int(os.environ.get('STATS_CACHE_DISK_MB', 256))
+
+VERSIONS_TABLE = 'table_versions'
+
+_memory = OrderedDict()
+_lock = threading.Lock()
+_counters = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'memory_evictions': 0, 'disk_evictions': 0}
+
+
+def ensure_versions_table(conn):
+    conn.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS {VERSIONS_TABLE} (
+            table_name text PRIMARY KEY,
+            version bigint NOT NULL DEFAULT 0,
+            updated_at timestamp NOT NULL DEFAULT now()
+        )
+    """))
+
+
+def get_table_version(conn, table_name):
+    try:
+        version = conn.execute(text(f'SELECT version FROM {VERSIONS_TABLE} WHERE table_name = :table_name'),
+                               {"table_name": table_name}).scalar()
+    except ProgrammingError:
+        # Nothing has been uploaded since the versions table was introduced.
+        conn.rollback()
+        return 0
+    return version or 0
+
+
+def bump_table_version(conn, table_name):
+    ensure_versions_table(conn)
+    return conn.execute(text(f"""
+        INSERT INTO {VERSIONS_TABLE} (table_name, version) VALUES (:table_name, 1)
+        ON CONFLICT (table_name) DO UPDATE SET version = {VERSIONS_TABLE}.version + 1, updated_at = now()
+        RETURNING version
+    """), {"table_name": table_name}).scalar()
+
+
+def make_key(*parts):
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+
+def disk_path(key):
+    return os.path.join(STATS_CACHE_DIR, f'{key}.pkl')
+
+
+def read_disk(key):
+    if not STATS_CACHE_DIR:
+        return None
+    path = disk_path(key)
+    try:
+        with open(path, 'rb') as f:
+            value = pickle.load(f)
+        os.utime(path)
+        return value
+    except (OSError, pickle.PickleError, EOFError):
+        return None
+
+
+def write_disk(key, value):
+    if not STATS_CACHE_DIR:
+        return
+    try:
+        os.makedirs(STATS_CACHE_DIR, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=STATS_CACHE_DIR, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        # os.replace is atomic, so other workers never read a half-written entry.
+        os.replace(tmp_path, disk_path(key))
+        trim_disk()
+    except OSError as e:
+        print(f"Stats cache write skipped: {e}")
+
+
+def trim_disk():
+    entries = []
+    for name in os.listdir(STATS_CACHE_DIR):
+        if name.endswith('.pkl'):
+            try:
+                stat = os.stat(os.path.join(STATS_CACHE_DIR, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+
+    total = sum(size for _, size, _ in entries)
+    limit = STATS_CACHE_DISK_MB * 1024 * 1024
+    for _, size, name in sorted(entries):
+        if total <= limit:
+            break
+        try:
+            os.remove(os.path.join(STATS_CACHE_DIR, name))
+            total -= size
+            with _lock:
+                _counters['disk_evictions'] += 1
+        except OSError:
+            continue
+
+
+def remember(key, value):
+    with _lock:
+        _memory[key] = value
+        _memory.move_to_end(key)
+        while len(_memory) > STATS_CACHE_SIZE:
+            _memory.popitem(last=False)
+            _counters['memory_evictions'] += 1
+
+
+def get_or_compute(key, compute):
+    with _lock:
+        if key in _memory:
+            _memory.move_to_end(key)
+            _counters['memory_hits'] += 1
+            return _memory[key]
+
+    value = read_disk(key)
+    if value is not None:
+        with _lock:
+            _counters['disk_hits'] += 1
+        remember(key, value)
+        return value
+
+    with _lock:
+        _counters['misses'] += 1
+    value = compute()
+    remember(key, value)
+    write_disk(key, value)
+    return value
+
+
+def clear():
+    with _lock:
+        _memory.clear()
+
+
+def get_cache_stats():
+    with _lock:
+        stats = dict(_counters)
+        stats['memory_entries'] = len(_memory)
+    lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+    stats['hit_ratio'] = round((stats['memory_hits'] + stats['disk_hits']) / lookups, 3) if lookups else None
+    stats['disk_enabled'] = bool(STATS_CACHE_DIR)
+    return stats
@@ -0,0 +1,116 @@
+import os
+import math
+import uuid
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from sql_aggregates import STAT_NAMES
+from quantile_sketch import build_sketch, merge_sketches, sketch_quantiles, quantile_levels
+
+STATS_STREAMING = os.environ.get('STATS_STREAMING', 'on')
+STREAM_BATCH_ROWS = int(os.environ.get('STREAM_BATCH_ROWS', 50000))
+
+
+def streaming_enabled():
+    return STATS_STREAMING == 'on'
+
+
+def empty_moments():
+    return {'count': 0, 'mean': 0.0, 'm2': 0.0, 'min': math.inf, 'max': -math.inf, 'sketch': build_sketch([])}
+
+
+def batch_moments(values):
+    values = np.asarray(values, dtype='float64')
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return empty_moments()
+
+    mean = values.mean()
+    return {
+        'count': len(values),
+        'mean': float(mean),
+        'm2': float(((values - mean) ** 2).sum()),
+        'min': float(values.min()),
+        'max': float(values.max()),
+        'sketch': build_sketch(values),
+    }
+
+
+def merge_counts(left, right):
+    # Chan et al.'s pairwise form of Welford's update, so batches (or partitions) merge in any order.
+    count = left['count'] + right['count']
+    delta = right['mean'] - left['mean']
+    return {
+        'count': count,
+        'mean': left['mean'] + delta * right['count'] / count,
+        'm2': left['m2'] + right['m2'] + delta * delta * left['count'] * right['count'] / count,
+        'min': min(left['min'], right['min']),
+        'max': max(left['max'], right['max']),
+    }
+
+
+def merge_moments(left, right):
+    if not right['count']:
+        return left
+    if not left['count']:
+        return right
+
+    merged = merge_counts(left, right)
+    merged['sketch'] = merge_sketches([left['sketch'], right['sketch']])
+    return merged
+
+
+def accumulate(moments_by_column, block, columns):
+    if not len(block):
+        return
+    for i, col in enumerate(columns):
+        moments_by_column[col] = merge_moments(moments_by_column[col], batch_moments(block[:, i]))
+
+
+def moments_row(moments):
+    count = moments['count']
+    if not count:
+        return [float('nan')] * len(STAT_NAMES)
+
+    std = math.sqrt(moments['m2'] / (count - 1)) if count > 1 else float('nan')
+    return [moments['mean'], moments['min'], moments['max'], std] + \
+        sketch_quantiles(*moments['sketch'], quantile_levels())
+
+
+def moments_frame(moments_by_column):
+    return pd.DataFrame([moments_row(moments) for moments in moments_by_column.values()],
+                        index=list(moments_by_column), columns=STAT_NAMES, dtype='float64')
+
+
+def iter_value_batches(conn, query, params=None, batch_rows=None):
+    batch_rows = batch_rows or STREAM_BATCH_ROWS
+    compiled = (text(query) if isinstance(query, str) else query).compile(dialect=conn.dialect)
+
+    # A named cursor keeps the result on the server, so only batch_rows rows are in memory at a time.
+    cursor = conn.connection.cursor(name=f'stream_stats_{uuid.uuid4().hex}')
+    cursor.itersize = batch_rows
+    try:
+        cursor.execute(str(compiled), compiled.construct_params(params or {}))
+        while True:
+            rows = cursor.fetchmany(batch_rows)
+            if not rows:
+                break
+            yield np.array(rows, dtype='float64')
+    finally:
+        cursor.close()
+
+
+def stream_statistics(batches, columns, group_names=None):
+    # With group_names, the first value of each row is the position of its group in group_names.
+    keys = list(group_names) if group_names else [None]
+    groups = {key: {col: empty_moments() for col in columns} for key in keys}
+
+    for block in batches:
+        if not group_names:
+            accumulate(groups[None], block, columns)
+            continue
+        codes, values = block[:, 0], block[:, 1:]
+        for code, key in enumerate(keys):
+            accumulate(groups[key], values[codes == code], columns)
+
+    return {key: moments_frame(moments_by_column) for key, moments_by_column in groups.items()}
@@ -0,0 +1,121 @@
+import pandas as pd
+from header_classifier import TIME_PERIOD_COLUMNS, is_date_header
+
+# Adding a HIRST station only needs its date column name here; the ingest, statistics, paging, rollup,
+# maintenance and table-list settings are all derived from TABLE_SCHEMAS.
+HIRST_STATIONS = ['LTKLAI', 'LTSIAU', 'LTVILN']
+
+BI_HOURLY_NUMERIC_COLUMNS = TIME_PERIOD_COLUMNS + ['Daily Total', 'Pollen Factor', 'Spores Factor']
+
+NUMERIC_DB_TYPES = ('real', 'double precision', 'numeric')
+
+INTEGER_DB_TYPES = ('smallint', 'integer', 'bigint')
+
+
+def hirst_table_name(station):
+    return f'hirst_{station.lower()}_bi_hourly_data'
+
+
+def hirst_bi_hourly_schema(station):
+    return {
+        'key_columns': [station, 'Particle'],
+        'date_column': station,
+        'date_type': 'date',
+        'date_format': 'ISO8601',
+        'numeric_columns': BI_HOURLY_NUMERIC_COLUMNS,
+        'index_name': f'idx_{station.lower()}',
+        'date_headers': False,
+        'display_name': f'{station} HIRST Bi-hourly Data',
+        'keyset_columns': [station, 'Particle'],
+    }
+
+
+TABLE_SCHEMAS = {hirst_table_name(station): hirst_bi_hourly_schema(station) for station in HIRST_STATIONS}
+
+TABLE_SCHEMAS['hirst_daily_particle_totals'] = {
+    'key_columns': ['station', 'particle'],
+    'date_column': None,
+    'date_type': None,
+    'date_format': None,
+    'numeric_columns': [],
+    'index_name': None,
+    # One real column per day, named by its date header.
+    'date_headers': True,
+    'display_name': 'HIRST Daily Particle Totals',
+    'keyset_columns': ['station', 'particle'],
+}
+
+TABLE_SCHEMAS['polen_sence_data'] = {
+    'key_columns': ['time'],
+    'date_column': 'time',
+    'date_type': 'timestamp',
+    'date_format': 'ISO8601',
+    'numeric_columns': ['pollen', 'mold', 'plastic_particles'],
+    'index_name': None,
+    'date_headers': False,
+    'display_name': 'Pollen Sence Data',
+    'keyset_columns': ['time'],
+}
+
+
+def compile_coercion(table_name, db_col_info):
+    schema = TABLE_SCHEMAS[table_name]
+    numeric_columns = list(dict.fromkeys(
+        [col for col in schema['numeric_columns'] if col in db_col_info] +
+        [col for col, data_type in db_col_info.items() if data_type in NUMERIC_DB_TYPES]
+    ))
+    date_column = schema['date_column'] if schema['date_column'] in db_col_info else None
+    integer_columns = [col for col, data_type in db_col_info.items()
+                       if data_type in INTEGER_DB_TYPES and col != date_column]
+
+    return {
+        'table_name': table_name,
+        'columns': set(db_col_info),
+        'date_headers': schema['date_headers'],
+        'numeric_columns': [col for col in numeric_columns if col != date_column and col not in integer_columns],
+        'integer_columns': integer_columns,
+        'date_column': date_column,
+        'date_format': schema['date_format'],
+    }
+
+
+def parse_dates(series, date_format):
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+
+    parsed = pd.to_datetime(series, format=date_format, errors='coerce')
+    failed = parsed.isna() & series.notna()
+    if failed.any():
+        # Only the values that do not follow the declared format go through pandas' inference.
+        parsed[failed] = pd.to_datetime(series[failed], format='mixed', errors='coerce')
+        failed = parsed.isna() & series.notna()
+        if failed.any():
+            raise ValueError(f"Could not parse date '{series[failed].iloc[0]}' in column '{series.name}'")
+    return parsed
+
+
+def apply_coercion(df, plan):
+    valid_cols = [col for col in df.columns if col in plan['columns'] or
+                  (plan['date_headers'] and isinstance(col, str) and is_date_header(col))]
+    df = df[valid_cols]
+
+    numeric_columns = [col for col in plan['numeric_columns'] if col in df.columns]
+    converted = {}
+    if numeric_columns:
+        try:
+            # Numbers and clean numeric text convert in one cast; only columns with junk need to_numeric.
+            converted = dict(df[numeric_columns].astype('float64').items())
+        except (ValueError, TypeError):
+            converted = {col: pd.to_numeric(df[col], errors='coerce') for col in numeric_columns}
+
+    # COPY rejects '3.0' for an integer column, so values are rounded to nullable integers before staging.
+    for col in plan['integer_columns']:
+        if col in df.columns:
+            converted[col] = pd.to_numeric(df[col], errors='coerce').round().astype('Int64')
+
+    if plan['date_column'] in df.columns:
+        converted[plan['date_column']] = parse_dates(df[plan['date_column']], plan['date_format'])
+    if converted:
+        df = df.assign(**converted)
+
+    return df, valid_cols
@@ -0,0 +1,95 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytestmark = pytest.mark.skipif(not os.environ.get('DATABASE_URL'), reason='DATABASE_URL is not set')
+
+PARITY_TABLE = 'stats_parity_data'
+PARITY_COLUMNS = ['Average', 'Min', 'Max', 'Standard Deviation', 'Median']
+
+
+@pytest.fixture(scope='module')
+def parity_table():
+    from sqlalchemy import text
+    from db import get_engine
+
+    rng = np.random.default_rng(0)
+    rows = 24 * 20
+    pollen = rng.gamma(2.0, 30.0, rows)
+    mold = rng.random(rows) * 10
+    mold[::7] = np.nan
+    df = pd.DataFrame({'time': pd.date_range('2024-04-01', periods=rows, freq='h'),
+                       'pollen': pollen, 'mold': mold, 'plastic_particles': rng.integers(0, 40, rows)})
+
+    engine = get_engine()
+    with engine.begin() as conn:
+        conn.execute(text(f'DROP TABLE IF EXISTS {PARITY_TABLE}'))
+        conn.execute(text(f'CREATE TABLE {PARITY_TABLE} (id serial, time timestamp, pollen real, '
+                          f'mold double precision, plastic_particles integer)'))
+    df.to_sql(PARITY_TABLE, engine, if_exists='append', index=False)
+
+    yield PARITY_TABLE
+
+    with engine.begin() as conn:
+        conn.execute(text(f'DROP TABLE IF EXISTS {PARITY_TABLE}'))
+
+
+@pytest.fixture
+def statistics_module(monkeypatch, parity_table):
+    import statistics
+    import quantile_sketch
+    import rollups
+
+    monkeypatch.setitem(statistics.DATE_COLUMN_MAPPING, parity_table, 'time')
+    monkeypatch.setattr(quantile_sketch, 'STATS_QUANTILES', 'exact')
+    monkeypatch.setattr(rollups, 'STATS_ROLLUPS', 'off')
+    return statistics
+
+
+@pytest.mark.parametrize('filters', [
+    {'start_date': '2024-04-01', 'end_date': '2024-04-20'},
+    {'start_date': '2024-04-05', 'end_date': '2024-04-09'},
+    {'selected_date': '2024-04-12'},
+])
+def test_sql_and_pandas_engines_agree(statistics_module, parity_table, filters):
+    sql_sample, sql_stats = statistics_module.fetch_statistics_sql(parity_table, **filters)
+    pandas_sample, pandas_stats = statistics_module.fetch_statistics_pandas(parity_table, **filters)
+
+    assert len(sql_sample) and len(pandas_sample)
+    columns = ['pollen', 'mold', 'plastic_particles']
+    expected = sql_stats.loc[columns, PARITY_COLUMNS].astype('float64')
+    actual = pandas_stats.loc[columns, PARITY_COLUMNS].astype('float64')
+    # real columns are summed as float32 by pandas and as double precision by PostgreSQL.
+    np.testing.assert_allclose(actual.to_numpy(), expected.to_numpy(), rtol=1e-5, atol=1e-6)
+
+
+def test_rollups_match_raw_rows(statistics_module, parity_table, monkeypatch):
+    import rollups
+    from sqlalchemy import text
+    from db import get_engine
+
+    filters = {'start_date': '2024-04-03', 'end_date': '2024-04-17'}
+    _, raw_stats = statistics_module.fetch_statistics_sql(parity_table, **filters)
+
+    monkeypatch.setitem(rollups.ROLLUP_SOURCES, parity_table, {'date_column': 'time'})
+    monkeypatch.setattr(rollups, 'STATS_ROLLUPS', 'on')
+    rollups.rebuild_rollups(parity_table)
+    try:
+        # Hourly rows keep every day's sketch lossless, so exact mode is answered from the rollups.
+        with get_engine().connect() as conn:
+            assert rollups.read_rollup_statistics(conn, parity_table, ['pollen'],
+                                                  statistics_module.get_date_bounds(**filters)) is not None
+        _, rollup_stats = statistics_module.fetch_statistics_sql(parity_table, **filters)
+    finally:
+        with get_engine().begin() as conn:
+            conn.execute(text(f'DELETE FROM {rollups.ROLLUP_TABLE} WHERE table_name = :name'), {'name': parity_table})
+            conn.execute(text(f'DELETE FROM {rollups.ROLLUP_STATE_TABLE} WHERE table_name = :name'),
+                         {'name': parity_table})
+
+    columns = ['pollen', 'mold', 'plastic_particles']
+    np.testing.assert_allclose(rollup_stats.loc[columns, PARITY_COLUMNS].to_numpy(dtype='float64'),
+                               raw_stats.loc[columns, PARITY_COLUMNS].to_numpy(dtype='float64'), rtol=1e-6)
@@ -1,295 +1,323 @@
 import os
-import datetime
+import re
+import csv
+import itertools
 import pandas as pd
 import json
 import sqlalchemy as sa
 from sqlalchemy.sql import text
 from sqlalchemy.exc import SQLAlchemyError
 from db import get_engine
-import time
+from daily_totals_store import use_long_storage, store_daily_totals_long
+from bulk_loader import staging_table_name, load_staging_table, upsert_from_staging
+from pagination import ensure_keyset_indexes, invalidate_row_count
+from stats_cache import bump_table_version
+from rollups import ROLLUP_SOURCES, update_rollups_for_upload, mark_rollups_stale
+from schema_cache import get_columns, get_column_types, invalidate as invalidate_schema
+from header_classifier import is_date_header, classify_headers
+from table_schemas import HIRST_STATIONS, TABLE_SCHEMAS, hirst_table_name, compile_coercion, apply_coercion
 
-def load_file(file_path):
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+INGEST_CHUNK_ROWS = int(os.environ.get('INGEST_CHUNK_ROWS', 100000))
+
+MERGE_MODE = os.environ.get('MERGE_MODE', 'upsert')
+
+KEY_COLUMNS = {table_name: schema['key_columns'] for table_name, schema in TABLE_SCHEMAS.items()}
+
+# Tables whose unique key index could not be built (duplicate keys); they use legacy_merge.
+_duplicate_key_tables = set()
+
+def sniff_csv_options(file_path, sample_size=65536):
+    with open(file_path, 'r', newline='', errors='replace') as f:
+        sample = f.read(sample_size)
+
+    try:
+        sep = csv.Sniffer().sniff(sample, delimiters=';,\t').delimiter
+    except csv.Error:
+        sep = ';' if sample.count(';') > sample.count(',') else ','
+
+    decimal = ',' if sep == ';' and re.search(r'\d,\d', sample) else '.'
+    return {'sep': sep, 'decimal': decimal}
+
+def iter_json_chunks(file_path, chunksize):
+    with open(file_path, 'r') as f:
+        first_char = f.read(1)
+        while first_char and first_char.isspace():
+            first_char = f.read(1)
+        f.seek(0)
+
+        if first_char != '[':
+            yield pd.json_normalize([json.load(f)])
+            return
+
+        if ijson is not None:
+            records = ijson.items(f, 'item', use_float=True)
+        else:
+            records = iter(json.load(f))
+
+        while True:
+            batch = list(itertools.islice(records, chunksize))
+            if not batch:
+                break
+            yield pd.json_normalize(batch)
+
+def rename_unnamed_columns(df):
+    for col in df.columns:
+        if isinstance(col, str) and col.startswith('Unnamed:'):
+            if col == 'Unnamed: 1':
+                df = df.rename(columns={col: 'Particle'})
+
+    return df
+
+def iter_file_chunks(file_path, chunksize=None):
     ext = os.path.splitext(file_path)[-1].lower()
+    chunksize = chunksize or INGEST_CHUNK_ROWS
 
     if ext == '.csv':
-        try:
-            df = pd.read_csv(file_path, sep=';', decimal=',')
-        except:
-            df = pd.read_csv(file_path)
+        with pd.read_csv(file_path, chunksize=chunksize, **sniff_csv_options(file_path)) as reader:
+            for chunk in reader:
+                yield rename_unnamed_columns(chunk)
     elif ext in ['.xls', '.xlsx']:
-        df = pd.read_excel(file_path)
+        yield rename_unnamed_columns(pd.read_excel(file_path))
     elif ext == '.json':
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-        df = pd.json_normalize(data) if isinstance(data, list) else pd.json_normalize([data])
+        for chunk in iter_json_chunks(file_path, chunksize):
+            yield rename_unnamed_columns(chunk)
     else:
         raise ValueError("Unsupported file format")
 
-    for col in df.columns:
-        if isinstance(col, str) and col.startswith('Unnamed:'):
-            if col == 'Unnamed: 1':
-                df = df.rename(columns={col: 'Particle'})
+def load_file(file_path):
+    chunks = list(iter_file_chunks(file_path))
+    return pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+
+def iter_sheet_frames(file_path):
+    ext = os.path.splitext(file_path)[-1].lower()
+    if ext in ['.xls', '.xlsx']:
+        for sheet_name, df in pd.read_excel(file_path, sheet_name=None).items():
+            if not df.empty:
+                yield sheet_name, rename_unnamed_columns(df)
+    else:
+        yield None, load_file(file_path)
+
+def report_progress(progress, stage, **info):
+    if progress is not None:
+        progress(stage, **info)
+
+def unique_key_name(table_name):
+    return f'uq_{table_name}_key'
+
+def unique_key_exists(connection, table_name):
+    return connection.execute(text("""
+        SELECT 1 FROM pg_indexes
+        WHERE schemaname = current_schema() AND tablename = :table_name AND indexname = :index_name
+    """), {"table_name": table_name, "index_name": unique_key_name(table_name)}).scalar() is not None
+
+def ensure_unique_key(connection, table_name, key_columns):
+    if table_name in _duplicate_key_tables:
+        return False
+    if unique_key_exists(connection, table_name):
+        return True
+
+    keys_str = ", ".join([f'"{col}"' for col in key_columns])
+    try:
+        connection.execute(text(f'CREATE UNIQUE INDEX IF NOT EXISTS {unique_key_name(table_name)} '
+                                f'ON {table_name} ({keys_str})'))
+        connection.commit()
+        return True
+    except SQLAlchemyError as e:
+        connection.rollback()
+        # Building the index scans the whole table, so it is not retried on every upload in this process.
+        _duplicate_key_tables.add(table_name)
+        print(f"Unique key on {table_name} could not be created, using legacy merge: {e}")
+        return False
+
+def normalize_columns(df, table_name):
+    if table_name == 'hirst_daily_particle_totals':
+        # Every recognised day header is stored under its ISO name, so 05/02/2024 and 2024-05-02 share a column.
+        renamed_columns = {}
+        for col, day in classify_headers(df.columns)['dates'].items():
+            if col != day.strftime('%Y-%m-%d'):
+                renamed_columns[col] = day.strftime('%Y-%m-%d')
+
+        if renamed_columns:
+            df = df.rename(columns=renamed_columns)
+            # When one file has two headers for the same day, keep the last one, as the merge would.
+            df = df.loc[:, ~df.columns.duplicated(keep='last')]
+
+        if 'Station' in df.columns:
+            df = df.rename(columns={'Station': 'station'})
+        if 'Particle' in df.columns:
+            df = df.rename(columns={'Particle': 'particle'})
 
     return df
 
-def store_to_db(df, table_name='hirst_ltklai_bi_hourly_data'):
+def prepare_table(connection, df, table_name):
+    if table_name == 'hirst_daily_particle_totals':
+        existing_columns = get_columns(connection, table_name)
+
+        date_columns = [col for col in df.columns
+                        if isinstance(col, str) and is_date_header(col) and col not in existing_columns]
+
+        for date_col in date_columns:
+            try:
+                alter_query = f"""
+                ALTER TABLE {table_name}
+                ADD COLUMN IF NOT EXISTS "{date_col}" real
+                """
+                connection.execute(text(alter_query))
+                connection.commit()
+                invalidate_schema(table_name)
+                print(f"Added new date column: {date_col}")
+            except Exception as e:
+                print(f"Error adding column {date_col}: {e}")
+                raise Exception(f"Failed to add column {date_col}: {e}")
+
+    # Each index is built in a savepoint: two workers creating the same index at once make one of them fail,
+    # and that must not abort the transaction the upload continues in.
+    schema = TABLE_SCHEMAS.get(table_name)
+    if schema is not None and schema['index_name']:
+        try:
+            with connection.begin_nested():
+                connection.execute(text(f'CREATE INDEX IF NOT EXISTS {schema["index_name"]} '
+                                        f'ON {table_name}("{schema["date_column"]}");'))
+        except Exception as e:
+            print(f"Index creation skipped: {e}")
+
+    try:
+        with connection.begin_nested():
+            connection.execute(text(f'CREATE INDEX IF NOT EXISTS idx_id_{table_name} ON {table_name}(id);'))
+        print(f"Created index on ID column for {table_name}")
+    except Exception as e:
+        print(f"ID index creation skipped: {e}")
+
+    try:
+        with connection.begin_nested():
+            ensure_keyset_indexes(connection, table_name)
+    except Exception as e:
+        print(f"Keyset index creation skipped: {e}")
+
+    db_col_info = get_column_types(connection, table_name)
+
+    if 'id' in db_col_info:
+        del db_col_info['id']
+
+    return db_col_info
+
+def drop_staging_table(connection, staging_name):
+    # The staging table is temporary to this pooled connection's session, so it must be dropped on it.
+    try:
+        connection.rollback()
+        connection.execute(text(f'DROP TABLE IF EXISTS "{staging_name}"'))
+        connection.commit()
+        print(f"Cleaned up temporary table: {staging_name}")
+    except Exception as cleanup_error:
+        print(f"Warning: Failed to clean up temporary table {staging_name}: {cleanup_error}")
+
+def store_to_db(df, table_name='hirst_ltklai_bi_hourly_data', progress=None):
+    return store_chunks_to_db([df], table_name, progress)
+
+def store_chunks_to_db(chunks, table_name='hirst_ltklai_bi_hourly_data', progress=None):
     engine = get_engine()
     temp_table_name = None
+    rows_in_file = 0
 
     try:
-        if table_name == 'hirst_daily_particle_totals':
-            renamed_columns = {}
-            for col in df.columns:
-                if isinstance(col, datetime.datetime):
-                    date_str = col.strftime('%Y-%m-%d')
-                    renamed_columns[col] = date_str
-
-            if renamed_columns:
-                df = df.rename(columns=renamed_columns)
-
-            if 'Station' in df.columns:
-                df = df.rename(columns={'Station': 'station'})
-            if 'Particle' in df.columns:
-                df = df.rename(columns={'Particle': 'particle'})
-
-            with engine.connect() as connection:
-                cols_query = f"""
-                SELECT column_name 
-                FROM information_schema.columns 
-                WHERE table_name = '{table_name}'
-                """
-                existing_columns = [row[0] for row in connection.execute(text(cols_query))]
-
-                date_pattern = r'\d{4}-\d{2}-\d{2}'
-                date_columns = [col for col in df.columns
-                                if isinstance(col, str) and
-                                pd.to_datetime(col, errors='coerce') is not pd.NaT and
-                                col not in existing_columns]
-
-                for date_col in date_columns:
-                    try:
-                        alter_query = f"""
-                        ALTER TABLE {table_name}
-                        ADD COLUMN IF NOT EXISTS "{date_col}" real
-                        """
-                        connection.execute(text(alter_query))
-                        connection.commit()
-                        print(f"Added new date column: {date_col}")
-                    except Exception as e:
-                        print(f"Error adding column {date_col}: {e}")
-                        raise Exception(f"Failed to add column {date_col}: {e}")
+        if table_name == 'hirst_daily_particle_totals' and use_long_storage():
+            report_progress(progress, 'merging', table_name=table_name)
+            upserted = 0
+            for df in chunks:
+                df = normalize_columns(df, table_name)
+                upserted += store_daily_totals_long(df, engine)
+                rows_in_file += len(df)
+            with engine.begin() as connection:
+                bump_table_version(connection, table_name)
+            invalidate_row_count(table_name)
+            return {'rows_in_file': rows_in_file, 'values_upserted': upserted}
+
+        key_columns = KEY_COLUMNS.get(table_name)
+        if key_columns is None:
+            raise ValueError(f"Unknown table: {table_name}")
 
-        if table_name == 'hirst_ltklai_bi_hourly_data':
-            if 'LTKLAI' in df.columns and not pd.api.types.is_datetime64_any_dtype(df['LTKLAI']):
-                df['LTKLAI'] = pd.to_datetime(df['LTKLAI'])
+        with engine.connect() as connection:
+            try:
+                coercion = None
+                staging_cols = None
 
-            numeric_columns = ['00-02', '02-04', '04-06', '06-08', '08-10', '10-12',
-                               '12-14', '14-16', '16-18', '18-20', '20-22', '22-24',
-                               'Daily Total', 'Pollen Factor', 'Spores Factor']
+                for df in chunks:
+                    report_progress(progress, 'staging', table_name=table_name, rows_in_file=rows_in_file)
+                    df = normalize_columns(df, table_name)
 
-            for col in numeric_columns:
-                if col in df.columns:
-                    df[col] = pd.to_numeric(df[col], errors='coerce')
+                    if coercion is None:
+                        coercion = compile_coercion(table_name, prepare_table(connection, df, table_name))
 
-        if table_name == 'hirst_ltsiau_bi_hourly_data':
-            if 'LTSIAU' in df.columns and not pd.api.types.is_datetime64_any_dtype(df['LTSIAU']):
-                df['LTSIAU'] = pd.to_datetime(df['LTSIAU'])
+                    df, valid_cols = apply_coercion(df, coercion)
 
-            numeric_columns = ['00-02', '02-04', '04-06', '06-08', '08-10', '10-12',
-                               '12-14', '14-16', '16-18', '18-20', '20-22', '22-24',
-                               'Daily Total', 'Pollen Factor', 'Spores Factor']
+                    if temp_table_name is None:
+                        for key in key_columns:
+                            if key not in valid_cols:
+                                raise ValueError(f"Key column '{key}' not found in the data. Available columns: {list(df.columns)}")
 
-            for col in numeric_columns:
-                if col in df.columns:
-                    df[col] = pd.to_numeric(df[col], errors='coerce')
+                        temp_table_name = staging_table_name(table_name)
+                        staging_cols = valid_cols
+                        load_staging_table(connection, engine, df, table_name, temp_table_name)
+                    else:
+                        # Later chunks must match the staging table created from the first chunk.
+                        df = df.reindex(columns=staging_cols)
+                        load_staging_table(connection, engine, df, table_name, temp_table_name, append=True)
 
-        if table_name == 'hirst_ltviln_bi_hourly_data':
-            if 'LTVILN' in df.columns and not pd.api.types.is_datetime64_any_dtype(df['LTVILN']):
-                df['LTVILN'] = pd.to_datetime(df['LTVILN'])
+                    rows_in_file += len(df)
 
-            numeric_columns = ['00-02', '02-04', '04-06', '06-08', '08-10', '10-12',
-                               '12-14', '14-16', '16-18', '18-20', '20-22', '22-24',
-                               'Daily Total', 'Pollen Factor', 'Spores Factor']
+                if temp_table_name is None:
+                    raise ValueError("File contains no data")
 
-            for col in numeric_columns:
-                if col in df.columns:
-                    df[col] = pd.to_numeric(df[col], errors='coerce')
+                # The staging table was created with exactly staging_cols, so no catalog lookup is needed for it.
+                existing_cols = get_columns(connection, table_name)
+                common_cols = [col for col in staging_cols if col in existing_cols]
 
-        if table_name == 'polen_sence_data':
-            if 'time' in df.columns and not pd.api.types.is_datetime64_any_dtype(df['time']):
-                df['time'] = pd.to_datetime(df['time'])
+                report_progress(progress, 'merging')
+                merge_mode = MERGE_MODE
+                if merge_mode == 'upsert' and not ensure_unique_key(connection, table_name, key_columns):
+                    merge_mode = 'legacy'
 
-            numeric_columns = ['pollen', 'mold', 'plastic_particles']
-            for col in numeric_columns:
-                if col in df.columns:
-                    df[col] = pd.to_numeric(df[col], errors='coerce')
+                if merge_mode == 'upsert':
+                    insert_count, update_count = upsert_from_staging(
+                        connection, table_name, temp_table_name, common_cols, key_columns
+                    )
+                else:
+                    insert_count, update_count = legacy_merge(
+                        connection, table_name, temp_table_name, common_cols, key_columns, staging_cols
+                    )
 
-        with engine.connect() as connection:
-            if table_name == 'hirst_ltklai_bi_hourly_data':
-                try:
-                    connection.execute(
-                        text('CREATE INDEX IF NOT EXISTS idx_ltklai ON hirst_ltklai_bi_hourly_data("LTKLAI");'))
-                except Exception as e:
-                    print(f"Index creation skipped: {e}")
-            elif table_name == 'hirst_ltsiau_bi_hourly_data':
                 try:
-                    connection.execute(
-                        text('CREATE INDEX IF NOT EXISTS idx_ltsiau ON hirst_ltsiau_bi_hourly_data("LTSIAU");'))
-                except Exception as e:
-                    print(f"Index creation skipped: {e}")
-            elif table_name == 'hirst_ltviln_bi_hourly_data':
-                try:
-                    connection.execute(
-                        text('CREATE INDEX IF NOT EXISTS idx_ltviln ON hirst_ltviln_bi_hourly_data("LTVILN");'))
+                    if table_name in ROLLUP_SOURCES:
+                        report_progress(progress, 'rollups')
+                        update_rollups_for_upload(connection, table_name, temp_table_name)
+                        connection.commit()
                 except Exception as e:
-                    print(f"Index creation skipped: {e}")
+                    # Stale rollups would give wrong statistics, so fall back to the raw table until rebuilt.
+                    print(f"Rollup refresh failed for {table_name}, marking rollups stale: {e}")
+                    connection.rollback()
+                    mark_rollups_stale(connection, table_name)
+                    connection.commit()
 
-            try:
-                connection.execute(text(f'CREATE INDEX IF NOT EXISTS idx_id_{table_name} ON {table_name}(id);'))
-                print(f"Created index on ID column for {table_name}")
-            except Exception as e:
-                print(f"ID index creation skipped: {e}")
-
-            cols_query = f"""
-            SELECT column_name, data_type 
-            FROM information_schema.columns 
-            WHERE table_name = '{table_name}'
-            """
-            db_col_info = {row[0]: row[1] for row in connection.execute(text(cols_query))}
-
-            if 'id' in db_col_info:
-                del db_col_info['id']
-
-            if table_name == 'hirst_daily_particle_totals':
-                valid_cols = [col for col in df.columns if col in db_col_info or
-                              (isinstance(col, str) and
-                               pd.to_datetime(col, errors='coerce') is not pd.NaT)]
-            else:
-                valid_cols = [col for col in df.columns if col in db_col_info]
-
-            df = df[valid_cols]
-
-            for col in valid_cols:
-                if col not in db_col_info:
-                    continue
-
-                data_type = db_col_info[col]
-                if data_type in ('real', 'double precision', 'numeric'):
-                    df[col] = pd.to_numeric(df[col], errors='coerce')
-                elif data_type == 'date' and col in ['LTKLAI', 'LTSIAU', 'LTVILN']:
-                    df[col] = pd.to_datetime(df[col], errors='coerce')
-                elif data_type == 'timestamp without time zone' and col == 'time':
-                    df[col] = pd.to_datetime(df[col], errors='coerce')
-
-            print("Column types after conversion:")
-            for col in df.columns:
-                print(f"  - {col}: {df[col].dtype}")
-
-            temp_table_name = f"temp_{table_name}_{int(time.time())}"
-            df.to_sql(temp_table_name, engine, if_exists='replace', index=False)
-
-            if table_name == 'hirst_daily_particle_totals':
-                key_columns = ['station', 'particle']
-            elif table_name == 'hirst_ltklai_bi_hourly_data':
-                key_columns = ['LTKLAI', 'Particle']
-            elif table_name == 'hirst_ltsiau_bi_hourly_data':
-                key_columns = ['LTSIAU', 'Particle']
-            elif table_name == 'hirst_ltviln_bi_hourly_data':
-                key_columns = ['LTVILN', 'Particle']
-            elif table_name == 'polen_sence_data':
-                key_columns = ['time']
-            else:
-                raise ValueError(f"Unknown table: {table_name}")
-
-            for key in key_columns:
-                if key not in valid_cols:
-                    raise ValueError(f"Key column '{key}' not found in the data. Available columns: {list(df.columns)}")
-
-            row_count_before = connection.execute(text(f"SELECT COUNT(*) FROM {table_name}")).scalar()
-
-            existing_cols_query = f"""
-            SELECT column_name FROM information_schema.columns 
-            WHERE table_name = '{table_name}'
-            """
-            existing_cols = [row[0] for row in connection.execute(text(existing_cols_query))]
-            temp_cols_query = f"""
-            SELECT column_name FROM information_schema.columns 
-            WHERE table_name = '{temp_table_name}'
-            """
-            temp_cols = [row[0] for row in connection.execute(text(temp_cols_query))]
-
-            common_cols = [col for col in temp_cols if col in existing_cols]
-            columns_str = ", ".join([f'"{col}"' for col in common_cols])
-
-            key_conditions = " AND ".join([f'a."{col}" = b."{col}"' for col in key_columns])
-            update_columns = [col for col in common_cols if col not in key_columns]
-            update_str = ", ".join([f'"{col}" = b."{col}"' for col in update_columns])
-
-            if table_name == 'hirst_ltklai_bi_hourly_data' and 'LTKLAI' in valid_cols:
-                key_conditions = key_conditions.replace(
-                    'a."LTKLAI" = b."LTKLAI"',
-                    'a."LTKLAI" = b."LTKLAI"::date'
-                )
-            elif table_name == 'hirst_ltsiau_bi_hourly_data' and 'LTSIAU' in valid_cols:
-                key_conditions = key_conditions.replace(
-                    'a."LTSIAU" = b."LTSIAU"',
-                    'a."LTSIAU" = b."LTSIAU"::date'
-                )
-            elif table_name == 'hirst_ltviln_bi_hourly_data' and 'LTVILN' in valid_cols:
-                key_conditions = key_conditions.replace(
-                    'a."LTVILN" = b."LTVILN"',
-                    'a."LTVILN" = b."LTVILN"::date'
-                )
-            elif table_name == 'polen_sence_data' and 'time' in valid_cols:
-                key_conditions = key_conditions.replace(
-                    'a."time" = b."time"',
-                    'a."time" = b."time"::timestamp'
-                )
-
-            update_count = 0
-            if update_columns:
-                update_query = f"""
-                UPDATE {table_name} a
-                SET {update_str}
-                FROM {temp_table_name} b
-                WHERE {key_conditions}
-                """
-                update_result = connection.execute(text(update_query))
+                connection.execute(text(f'DROP TABLE IF EXISTS "{temp_table_name}"'))
+                bump_table_version(connection, table_name)
                 connection.commit()
-                update_count = update_result.rowcount
-                print(f"  - {update_count} existing rows updated")
-
-            insert_query = f"""
-            INSERT INTO {table_name} ({columns_str})
-            SELECT {columns_str} FROM {temp_table_name} b
-            WHERE NOT EXISTS (
-                SELECT 1 FROM {table_name} a
-                WHERE {key_conditions}
-            )
-            """
-
-            insert_result = connection.execute(text(insert_query))
-            connection.commit()
-            insert_count = insert_result.rowcount
+                invalidate_row_count(table_name)
+                temp_table_name = None
 
-            connection.execute(text(f"DROP TABLE IF EXISTS {temp_table_name}"))
-            connection.commit()
-            temp_table_name = None
-
-            try:
-                connection.execute(text(f"CLUSTER {table_name} USING idx_id_{table_name};"))
-                connection.execute(text(f"ALTER TABLE {table_name} CLUSTER ON idx_id_{table_name};"))
-                print(f"Table {table_name} clustered by ID - data is now physically ordered by ID")
-            except Exception as e:
-                print(f"Clustering operation failed: {e}")
-
-            row_count_after = connection.execute(text(f"SELECT COUNT(*) FROM {table_name}")).scalar()
+                print(f"Data processed for '{table_name}' table:")
+                print(f"  - {rows_in_file} rows in file")
+                print(f"  - {insert_count} new rows inserted")
+                print(f"  - {update_count} existing rows updated")
 
-            print(f"Data processed for '{table_name}' table:")
-            print(f"  - {len(df)} rows in file")
-            print(f"  - {insert_count} new rows inserted")
-            print(f"  - {update_count} existing rows updated")
-            print(f"  - {row_count_after - row_count_before} net change in row count")
+                return {'rows_in_file': rows_in_file, 'rows_inserted': insert_count, 'rows_updated': update_count}
+            finally:
+                if temp_table_name is not None:
+                    drop_staging_table(connection, temp_table_name)
 
     except SQLAlchemyError as e:
         error_msg = f"Database error while processing {table_name}: {str(e)}"
@@ -299,68 +327,106 @@ def store_to_db(df, table_name='hirst_ltklai_bi_hourly_data'):
         error_msg = f"Error processing data for {table_name}: {str(e)}"
         print(error_msg)
         raise Exception(error_msg)
-    finally:
-        if temp_table_name is not None:
-            try:
-                with engine.connect() as connection:
-                    connection.execute(text(f"DROP TABLE IF EXISTS {temp_table_name}"))
-                    connection.commit()
-                    print(f"Cleaned up temporary table: {temp_table_name}")
-            except Exception as cleanup_error:
-                print(f"Warning: Failed to clean up temporary table {temp_table_name}: {cleanup_error}")
 
-def ingest_file(file_path, table_name=None):
+def legacy_merge(connection, table_name, temp_table_name, common_cols, key_columns, valid_cols):
+    row_count_before = connection.execute(text(f"SELECT COUNT(*) FROM {table_name}")).scalar()
+
+    columns_str = ", ".join([f'"{col}"' for col in common_cols])
+
+    key_conditions = " AND ".join([f'a."{col}" = b."{col}"' for col in key_columns])
+    update_columns = [col for col in common_cols if col not in key_columns]
+    update_str = ", ".join([f'"{col}" = b."{col}"' for col in update_columns])
+
+    date_column = TABLE_SCHEMAS[table_name]['date_column']
+    if date_column in key_columns and date_column in valid_cols:
+        key_conditions = key_conditions.replace(
+            f'a."{date_column}" = b."{date_column}"',
+            f'a."{date_column}" = b."{date_column}"::{TABLE_SCHEMAS[table_name]["date_type"]}'
+        )
+
+    update_count = 0
+    if update_columns:
+        update_query = f"""
+        UPDATE {table_name} a
+        SET {update_str}
+        FROM {temp_table_name} b
+        WHERE {key_conditions}
+        """
+        update_result = connection.execute(text(update_query))
+        connection.commit()
+        update_count = update_result.rowcount
+        print(f"  - {update_count} existing rows updated")
+
+    insert_query = f"""
+    INSERT INTO {table_name} ({columns_str})
+    SELECT {columns_str} FROM {temp_table_name} b
+    WHERE NOT EXISTS (
+        SELECT 1 FROM {table_name} a
+        WHERE {key_conditions}
+    )
+    """
+
+    insert_result = connection.execute(text(insert_query))
+    connection.commit()
+    insert_count = insert_result.rowcount
+
+    row_count_after = connection.execute(text(f"SELECT COUNT(*) FROM {table_name}")).scalar()
+    print(f"  - {row_count_after - row_count_before} net change in row count")
+
+    return insert_count, update_count
+
+def detect_table(df):
+    headers = classify_headers(df.columns)
+    if all(col in df.columns for col in ['time', 'pollen']):
+        return 'polen_sence_data'
+    elif headers['dates']:
+        return 'hirst_daily_particle_totals'
+    else:
+        if headers['periods']:
+            for station in HIRST_STATIONS:
+                if station in df.columns:
+                    return hirst_table_name(station)
+            return hirst_table_name(HIRST_STATIONS[0])
+        else:
+            raise ValueError(
+                "Could not determine appropriate table for this data format. Please check that your file contains the expected columns.")
+
+def validate_columns(df, table_name):
+    if table_name == 'hirst_daily_particle_totals':
+        required_cols = ['station', 'particle']
+        missing_cols = [col for col in required_cols if col not in df.columns and col.title() not in df.columns]
+        if missing_cols:
+            raise ValueError(f"File structure doesn't match {table_name}. Missing required columns: {missing_cols}")
+
+    elif table_name in [hirst_table_name(station) for station in HIRST_STATIONS]:
+        station_col = TABLE_SCHEMAS[table_name]['date_column']
+        if station_col not in df.columns:
+            raise ValueError(f"File structure doesn't match {table_name}. Missing required column: {station_col}")
+
+    elif table_name == 'polen_sence_data':
+        required_cols = ['time', 'pollen']
+        missing_cols = [col for col in required_cols if col not in df.columns]
+        if missing_cols:
+            raise ValueError(f"File structure doesn't match {table_name}. Missing required columns: {missing_cols}")
+
+def ingest_file(file_path, table_name=None, progress=None):
     try:
-        df = load_file(file_path)
-        print(f"Loaded {len(df)} rows from {file_path}")
+        report_progress(progress, 'parsing')
+        chunks = iter_file_chunks(file_path)
+        df = next(chunks, None)
+        if df is None:
+            raise ValueError("File contains no data")
+        print(f"Loaded first {len(df)} rows from {file_path}")
         print(f"Columns: {df.columns.tolist()}")
 
+        report_progress(progress, 'validating')
         if table_name is None:
-            polen_sence_columns = ['time', 'pollen', 'mold', 'plastic_particles']
-            if all(col in df.columns for col in ['time', 'pollen']):
-                table_name = 'polen_sence_data'
-            elif any(isinstance(col, datetime.datetime) for col in df.columns) or any(
-                    isinstance(col, str) and pd.to_datetime(col, errors='coerce') is not pd.NaT
-                    for col in df.columns):
-                table_name = 'hirst_daily_particle_totals'
-            else:
-                time_period_columns = ['00-02', '02-04', '04-06', '06-08', '08-10', '10-12',
-                                       '12-14', '14-16', '16-18', '18-20', '20-22', '22-24']
-
-                if any(col in df.columns for col in time_period_columns):
-                    if 'LTKLAI' in df.columns:
-                        table_name = 'hirst_ltklai_bi_hourly_data'
-                    elif 'LTSIAU' in df.columns:
-                        table_name = 'hirst_ltsiau_bi_hourly_data'
-                    elif 'LTVILN' in df.columns:
-                        table_name = 'hirst_ltviln_bi_hourly_data'
-                    else:
-                        table_name = 'hirst_ltklai_bi_hourly_data'
-                else:
-                    raise ValueError(
-                        "Could not determine appropriate table for this data format. Please check that your file contains the expected columns.")
+            table_name = detect_table(df)
 
         print(f"Determined table type: {table_name}")
+        validate_columns(df, table_name)
 
-        if table_name == 'hirst_daily_particle_totals':
-            required_cols = ['station', 'particle']
-            missing_cols = [col for col in required_cols if col not in df.columns and col.title() not in df.columns]
-            if missing_cols:
-                raise ValueError(f"File structure doesn't match {table_name}. Missing required columns: {missing_cols}")
-
-        elif table_name in ['hirst_ltklai_bi_hourly_data', 'hirst_ltsiau_bi_hourly_data',
-                            'hirst_ltviln_bi_hourly_data']:
-            station_col = table_name.split('_')[1].upper()
-            if station_col not in df.columns:
-                raise ValueError(f"File structure doesn't match {table_name}. Missing required column: {station_col}")
-
-        elif table_name == 'polen_sence_data':
-            required_cols = ['time', 'pollen']
-            missing_cols = [col for col in required_cols if col not in df.columns]
-            if missing_cols:
-                raise ValueError(f"File structure doesn't match {table_name}. Missing required columns: {missing_cols}")
-
-        store_to_db(df, table_name)
+        return store_chunks_to_db(itertools.chain([df], chunks), table_name, progress)
 
     except Exception as e:
         error_msg = f"Failed to process {file_path}: {str(e)}"